@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import argparse
+import dataclasses
 import json
 import logging
 import os
@@ -218,7 +219,7 @@ def main() -> None:
         if args.command == "list":
             discovered = run_inspect.discover_runs(workspace)
             if args.json:
-                print(json.dumps([ri.__dict__ | {"dir": str(ri.dir)} for ri in discovered], indent=2))
+                print(json.dumps([dataclasses.asdict(ri) | {"dir": str(ri.dir)} for ri in discovered], indent=2))
             else:
                 print(run_inspect.format_runs_table(discovered))
             return
@@ -226,8 +227,8 @@ def main() -> None:
             run_dir = run_inspect.resolve_run_ref(workspace, args.run_ref)
             if args.json:
                 manifest = json.loads((run_dir / "run.json").read_text(encoding="utf-8"))
-                events = run_inspect.load_events(run_dir)
-                print(json.dumps({"manifest": manifest, "events": events[-args.tail :]}, indent=2))
+                events = run_inspect.load_events(run_dir, tail=args.tail)
+                print(json.dumps({"manifest": manifest, "events": events}, indent=2))
             else:
                 print(run_inspect.format_run_show(run_dir, tail=args.tail))
             return
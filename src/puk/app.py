@@ -1,15 +1,18 @@
 from __future__ import annotations
 
 import asyncio
+import functools
+import heapq
 import logging
 import fnmatch
 import os
 import re
+import stat
 import urllib.parse
 import json
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Protocol
+from typing import Callable, Protocol
 
 from copilot import CopilotClient
 from copilot.tools import define_tool
@@ -21,6 +24,7 @@ from prompt_toolkit.key_binding import KeyBindings
 from prompt_toolkit.patch_stdout import patch_stdout
 
 from puk.config import BYOK_PROVIDERS, LLMSettings, WorkspaceSettings
+from puk.paths import is_within, relative_posix
 from puk.playbooks import is_path_within_scope
 from puk.run import RunRecorder
 from puk import runs as run_inspect
@@ -28,6 +32,7 @@ from puk.ui import ConsoleRenderer
 
 _ENV_NAME_PATTERN = re.compile(r"^[A-Z_][A-Z0-9_]*$")
 _LOG = logging.getLogger("puk")
+_EXIT_COMMANDS = frozenset({"/exit", "/quit", "quit", "exit"})
 
 _TOOL_ALIASES: dict[str, str] = {
     "read": "read_file",
@@ -141,15 +146,130 @@ def _summarize_json(value: object, limit: int = 240) -> str:
 def _coerce_turn_id(raw: object) -> int | None:
     if raw is None:
         return None
-    try:
+    if type(raw) is int:
+        return raw
+    if isinstance(raw, str):
+        text = raw.strip()
+    else:
         text = str(raw).strip()
-        if not text:
-            return None
+    if not text:
+        return None
+    try:
         return int(text)
     except Exception:
         return None
 
 
+def _write_text(target: Path, content: str, append: bool) -> None:
+    with target.open("a" if append else "w", encoding="utf-8") as handle:
+        handle.write(content)
+
+
+def _discard_chunk(_chunk: str) -> None:
+    return None
+
+
+_GLOB_META = frozenset("*?[")
+_GLOB_VERDICT_CACHE_SIZE = 4096
+# Patterns and paths are normcased before matching, which on Windows also turns "/" into "\\".
+_NORM_SEP = os.path.normcase("/")
+
+
+@dataclass(frozen=True, slots=True)
+class _GlobSet:
+    """Glob patterns decided by plain string tests; the rest are left in ``wildcards``."""
+
+    literals: frozenset[str]
+    prefixes: tuple[str, ...]
+    suffixes: tuple[str, ...]
+    # From "**/*<suffix>": as in fnmatch, a separator must precede the suffix.
+    nested_suffixes: tuple[str, ...]
+    wildcards: tuple[str, ...]
+
+    def matches_plain(self, rel: str) -> bool:
+        if rel in self.literals or rel.startswith(self.prefixes) or rel.endswith(self.suffixes):
+            return True
+        for suffix in self.nested_suffixes:
+            if rel.endswith(suffix) and _NORM_SEP in rel[: len(rel) - len(suffix)]:
+                return True
+        return False
+
+
+def _is_literal_glob(pattern: str) -> bool:
+    return _GLOB_META.isdisjoint(pattern)
+
+
+def _build_glob_set(patterns: tuple[str, ...]) -> _GlobSet:
+    literals: set[str] = set()
+    prefixes: list[str] = []
+    suffixes: list[str] = []
+    nested_suffixes: list[str] = []
+    wildcards: list[str] = []
+    for raw in patterns:
+        pattern = os.path.normcase(raw)
+        head = pattern.lstrip("*")
+        tail = pattern.rstrip("*")
+        if _is_literal_glob(pattern):
+            literals.add(pattern)
+        elif head != pattern and _is_literal_glob(head):
+            suffixes.append(head)
+        elif tail != pattern and _is_literal_glob(tail):
+            prefixes.append(tail)
+        elif (
+            head != pattern
+            and head.startswith(_NORM_SEP + "*")
+            and _is_literal_glob(head[len(_NORM_SEP) + 1 :])
+        ):
+            nested_suffixes.append(head[len(_NORM_SEP) + 1 :])
+        else:
+            wildcards.append(pattern)
+    return _GlobSet(
+        literals=frozenset(literals),
+        prefixes=tuple(prefixes),
+        suffixes=tuple(suffixes),
+        nested_suffixes=tuple(nested_suffixes),
+        wildcards=tuple(wildcards),
+    )
+
+
+def _glob_alternation(patterns: tuple[str, ...]) -> str:
+    # Matches exactly what fnmatch.fnmatch would for any of the (normcased) patterns.
+    return "|".join(f"(?:{fnmatch.translate(p)})" for p in patterns)
+
+
+@dataclass(frozen=True, slots=True)
+class _GlobPolicy:
+    """Workspace allow/deny globs: string fast paths first, then one tagged regex."""
+
+    deny: _GlobSet
+    allow: _GlobSet | None
+    wildcards: re.Pattern[str] | None
+
+    def allows(self, rel: str) -> bool:
+        if self.deny.matches_plain(rel):
+            return False
+        match = self.wildcards.match(rel) if self.wildcards is not None else None
+        if match is not None and match.lastgroup == "deny":
+            return False
+        if self.allow is None:
+            return True
+        return self.allow.matches_plain(rel) or match is not None
+
+
+@functools.lru_cache(maxsize=256)
+def _compile_glob_policy(deny: tuple[str, ...], allow: tuple[str, ...]) -> _GlobPolicy:
+    # Deny alternatives come first, so a path matching both is tagged "deny".
+    deny_set = _build_glob_set(deny)
+    allow_set = _build_glob_set(allow) if allow else None
+    groups = []
+    if deny_set.wildcards:
+        groups.append(f"(?P<deny>{_glob_alternation(deny_set.wildcards)})")
+    if allow_set is not None and allow_set.wildcards:
+        groups.append(f"(?P<allow>{_glob_alternation(allow_set.wildcards)})")
+    wildcards = re.compile("|".join(groups)) if groups else None
+    return _GlobPolicy(deny=deny_set, allow=allow_set, wildcards=wildcards)
+
+
 def _extract_error_message(raw_error: object) -> str:
     if raw_error is None:
         return ""
@@ -257,6 +377,35 @@ def _provider_config(settings: LLMSettings) -> dict | None:
 
 
 class PukApp:
+    # Compatibility tool name -> (handler method, params model, description).
+    _COMPATIBILITY_TOOL_DEFS: dict[str, tuple[str, type[BaseModel], str]] = {
+        "create_directory": (
+            "_tool_create_directory",
+            _PathParams,
+            "Create a directory path inside the workspace.",
+        ),
+        "create_file": (
+            "_tool_create_file",
+            _CreateFileParams,
+            "Create a new file with optional initial content.",
+        ),
+        "write_file": (
+            "_tool_write_file",
+            _WriteFileParams,
+            "Write or append file content. Creates the file if missing.",
+        ),
+        "read_file": (
+            "_tool_read_file",
+            _ReadFileParams,
+            "Read a file from the workspace, optionally by line range.",
+        ),
+        "list_directory": (
+            "_tool_list_directory",
+            _ListDirectoryParams,
+            "List directory contents from the workspace.",
+        ),
+    }
+
     def __init__(self, config: PukConfig, run_recorder: RunRecorder | None = None):
         self.config = config
         self.client = CopilotClient()
@@ -267,6 +416,7 @@ class PukApp:
         self.run_recorder = run_recorder
         self._active_turn_id: int | None = None
         self._output_buffer: list[str] = []
+        self._buffer_delta: Callable[[str], None] = _discard_chunk
         self._capture_output = False
         self._last_output: str | None = None
         self._last_tool_name: str | None = None
@@ -280,19 +430,42 @@ class PukApp:
         self._max_identical_tool_failures = self._read_positive_int_env(
             "PUK_MAX_IDENTICAL_TOOL_FAILURES", default=8
         )
+        self._normalized_tools: list[str] | None = (
+            self._normalize_allowed_tools(config.allowed_tools)
+            if config.allowed_tools is not None
+            else None
+        )
+        settings = config.workspace_settings
+        self._workspace_root = Path(config.workspace).resolve()
+        self._ignore = frozenset(settings.ignore)
+        self._glob_policy = _compile_glob_policy(
+            tuple(settings.deny_globs), tuple(settings.allow_globs)
+        )
+        self._glob_verdicts: dict[str, bool] = {}
+        self._session_config: dict | None = None
+        self._compatibility_tools: dict[frozenset[str], list[Tool]] = {}
+        self._local_commands: dict[str, Callable[[str], None]] = {
+            "/runs": lambda _ref: self._cmd_list_runs(),
+            "/run": self._cmd_show_run,
+            "/tail": self._cmd_tail_run,
+        }
 
     def session_config(self) -> dict:
-        normalized_tools: list[str] | None = None
+        if self._session_config is None:
+            self._session_config = self._build_session_config()
+        return self._session_config
+
+    def _build_session_config(self) -> dict:
+        normalized_tools = self._normalized_tools
         excluded_tools = []
-        if self.config.allowed_tools is not None:
-            normalized_tools = self._normalize_allowed_tools(self.config.allowed_tools)
+        if normalized_tools is not None:
             allowed_lower = {name.strip().lower() for name in normalized_tools}
             # Prevent shell fallback when a playbook does not allow bash.
             if "bash" not in allowed_lower:
                 excluded_tools.append("bash")
         config = {
             "streaming": True,
-            "working_directory": str(Path(self.config.workspace).resolve()),
+            "working_directory": str(self._workspace_root),
             "excluded_tools": excluded_tools,
             "system_message": {"content": DEFAULT_SYSTEM_PROMPT},
             "on_permission_request": self._permission_handler(),
@@ -316,6 +489,7 @@ class PukApp:
         if self.config.execution_mode == "plan" or self.config.write_scope is not None:
             write_scope = self.config.write_scope or []
             workspace = Path(self.config.workspace)
+            workspace_resolved = self._workspace_root
 
             def _handler(request: dict, metadata: dict) -> dict:
                 tool_name = _normalize_tool_name(_extract_tool_name(request, metadata))
@@ -326,7 +500,7 @@ class PukApp:
                     if not paths:
                         return _deny_permission("Write scope enforcement requires a target path.")
                     for path in paths:
-                        if not is_path_within_scope(path, workspace, write_scope):
+                        if not is_path_within_scope(path, workspace, write_scope, workspace_resolved):
                             return _deny_permission(
                                 f"Path '{path}' is outside the allowed write scope."
                             )
@@ -347,84 +521,102 @@ class PukApp:
     def _on_event(self, event: SessionEvent) -> None:
         # Debug: uncomment to see all events
         # print(f"[DEBUG] {event.type}")
-        if event.type == SessionEventType.ASSISTANT_MESSAGE_DELTA:
-            self._mark_response_started()
-            self._reset_tool_loop_state()
-            chunk = event.data.delta_content
-            if chunk:
-                self.renderer.write_delta(chunk)
-                if (self.run_recorder or self._capture_output) and self._active_turn_id is not None:
-                    self._output_buffer.append(chunk)
-        elif event.type == SessionEventType.ASSISTANT_REASONING_DELTA:
-            self._mark_response_started()
-            self._reset_tool_loop_state()
-        elif event.type == SessionEventType.ASSISTANT_TURN_END:
-            self._mark_response_started()
-            self._reset_tool_loop_state()
-            self._tool_name_by_call_id = {}
-            self._reset_tool_failure_state()
-            self.renderer.end_message()
-            if self.run_recorder and self._active_turn_id is not None:
-                text = "".join(self._output_buffer)
-                self.run_recorder.record_model_output(text, turn_id=self._active_turn_id)
-            if self._capture_output and self._active_turn_id is not None:
-                self._last_output = "".join(self._output_buffer)
-            self._output_buffer = []
-            self._active_turn_id = None
-            self._capture_output = False
-        elif event.type == SessionEventType.TOOL_EXECUTION_START:
-            self._mark_response_started()
-            name = event.data.tool_name or "unknown"
-            tool_call_id = event.data.tool_call_id
-            if tool_call_id:
-                self._tool_name_by_call_id[tool_call_id] = name
-            arguments = (
-                _summarize_json(event.data.arguments)
-                if getattr(event.data, "arguments", None) is not None
-                else None
+        handler_name = self._EVENT_HANDLERS.get(event.type)
+        if handler_name is not None:
+            getattr(self, handler_name)(event.data)
+
+    def _on_message_delta(self, data) -> None:
+        self._mark_response_started()
+        self._reset_tool_loop_state()
+        chunk = data.delta_content
+        if chunk:
+            self.renderer.write_delta(chunk)
+            self._buffer_delta(chunk)
+
+    def _on_reasoning_delta(self, data) -> None:
+        self._mark_response_started()
+        self._reset_tool_loop_state()
+
+    def _on_turn_end(self, data) -> None:
+        self._mark_response_started()
+        self._reset_tool_loop_state()
+        self._tool_name_by_call_id = {}
+        self._reset_tool_failure_state()
+        self.renderer.end_message()
+        if self.run_recorder and self._active_turn_id is not None:
+            text = "".join(self._output_buffer)
+            self.run_recorder.record_model_output(text, turn_id=self._active_turn_id)
+        if self._capture_output and self._active_turn_id is not None:
+            self._last_output = "".join(self._output_buffer)
+        self._output_buffer = []
+        self._buffer_delta = _discard_chunk
+        self._active_turn_id = None
+        self._capture_output = False
+
+    def _on_tool_start(self, data) -> None:
+        self._mark_response_started()
+        name = data.tool_name or "unknown"
+        tool_call_id = data.tool_call_id
+        if tool_call_id:
+            self._tool_name_by_call_id[tool_call_id] = name
+        arguments = (
+            _summarize_json(data.arguments)
+            if getattr(data, "arguments", None) is not None
+            else None
+        )
+        self.renderer.show_tool_event(name)
+        turn_id = self._resolve_turn_id(data.turn_id)
+        if self.run_recorder:
+            self.run_recorder.record_tool_call(
+                name=name,
+                turn_id=turn_id,
+                tool_call_id=tool_call_id,
+                arguments=arguments,
+            )
+        self._record_tool_streak(name)
+        if self._max_identical_tool_calls and self._identical_tool_streak > self._max_identical_tool_calls:
+            raise RuntimeError(
+                f"Tool loop guard triggered after {self._identical_tool_streak} consecutive '{name}' calls."
+            )
+
+    def _on_tool_complete(self, data) -> None:
+        success, result = _summarize_tool_result_data(data)
+        turn_id = self._resolve_turn_id(data.turn_id)
+        tool_call_id = data.tool_call_id
+        name = data.tool_name or self._tool_name_by_call_id.get(tool_call_id) or "unknown"
+        if tool_call_id:
+            self._tool_name_by_call_id.pop(tool_call_id, None)
+        self.renderer.show_tool_result(name, success, result)
+        self._record_tool_failure(name, success, result)
+        if self.run_recorder:
+            self.run_recorder.record_tool_result(
+                name=name,
+                turn_id=turn_id,
+                tool_call_id=tool_call_id,
+                success=success,
+                result=result,
             )
-            self.renderer.show_tool_event(name)
-            turn_id = self._resolve_turn_id(event.data.turn_id)
-            if self.run_recorder:
-                self.run_recorder.record_tool_call(
-                    name=name,
-                    turn_id=turn_id,
-                    tool_call_id=tool_call_id,
-                    arguments=arguments,
-                )
-            self._record_tool_streak(name)
-            if self._max_identical_tool_calls and self._identical_tool_streak > self._max_identical_tool_calls:
-                raise RuntimeError(
-                    f"Tool loop guard triggered after {self._identical_tool_streak} consecutive '{name}' calls."
-                )
-        elif event.type == SessionEventType.TOOL_EXECUTION_COMPLETE:
-            success, result = _summarize_tool_result_data(event.data)
-            turn_id = self._resolve_turn_id(event.data.turn_id)
-            tool_call_id = event.data.tool_call_id
-            name = event.data.tool_name or self._tool_name_by_call_id.get(tool_call_id) or "unknown"
-            if tool_call_id:
-                self._tool_name_by_call_id.pop(tool_call_id, None)
-            self.renderer.show_tool_result(name, success, result)
-            self._record_tool_failure(name, success, result)
-            if self.run_recorder:
-                self.run_recorder.record_tool_result(
-                    name=name,
-                    turn_id=turn_id,
-                    tool_call_id=tool_call_id,
-                    success=success,
-                    result=result,
-                )
-        elif event.type == SessionEventType.SESSION_ERROR:
-            self._mark_response_started()
-            # Errors are surfaced via send_and_wait exceptions; avoid duplicate prints here.
-            pass
-        elif event.type == SessionEventType.TOOL_USER_REQUESTED:
-            # User confirmation requested for a tool - auto-approve handled by permission handler
-            pass
+
+    def _on_session_error(self, data) -> None:
+        self._mark_response_started()
+        # Errors are surfaced via send_and_wait exceptions; avoid duplicate prints here.
+
+    # TOOL_USER_REQUESTED needs no handler: auto-approval is done by the permission handler.
+    # Handlers are looked up by name so subclass overrides and instance patches take effect.
+    _EVENT_HANDLERS: dict[SessionEventType, str] = {
+        SessionEventType.ASSISTANT_MESSAGE_DELTA: "_on_message_delta",
+        SessionEventType.ASSISTANT_REASONING_DELTA: "_on_reasoning_delta",
+        SessionEventType.ASSISTANT_TURN_END: "_on_turn_end",
+        SessionEventType.TOOL_EXECUTION_START: "_on_tool_start",
+        SessionEventType.TOOL_EXECUTION_COMPLETE: "_on_tool_complete",
+        SessionEventType.SESSION_ERROR: "_on_session_error",
+    }
 
     async def start(self) -> None:
+        # Build the session config before spawning the client so config errors fail fast.
+        config = self.session_config()
         await self.client.start()
-        self.session = await self.client.create_session(self.session_config())
+        self.session = await self.client.create_session(config)
         self.session.on(self._on_event)
         await self._log_backend_selected_model()
         if self.run_recorder:
@@ -445,6 +637,10 @@ class PukApp:
         self._active_turn_id = turn_id
         self._output_buffer = []
         self._capture_output = capture
+        if (self.run_recorder or capture) and turn_id is not None:
+            self._buffer_delta = self._output_buffer.append
+        else:
+            self._buffer_delta = _discard_chunk
         self._last_output = None
         self._tool_name_by_call_id = {}
         self._reset_tool_loop_state()
@@ -455,15 +651,15 @@ class PukApp:
         try:
             await self.session.send_and_wait({"prompt": prompt}, timeout=600)
         except Exception as exc:
+            message = str(exc)
             if self.run_recorder:
-                self.run_recorder.close(status="failed", reason=str(exc))
-            raise RuntimeError(self._user_facing_error(exc)) from None
+                self.run_recorder.close(status="failed", reason=message)
+            raise RuntimeError(self._user_facing_error(message)) from None
         finally:
             self._mark_response_started()
         return self._last_output
 
-    def _user_facing_error(self, exc: Exception) -> str:
-        message = str(exc)
+    def _user_facing_error(self, message: str) -> str:
         if (
             self.config.llm.provider == "azure"
             and not self.config.llm.model
@@ -482,8 +678,9 @@ class PukApp:
         self.renderer.hide_working()
 
     def _resolve_turn_id(self, event_turn_id: object) -> int | None:
-        if self._active_turn_id is not None:
-            return self._active_turn_id
+        active_turn_id = self._active_turn_id
+        if active_turn_id is not None:
+            return active_turn_id
         parsed = _coerce_turn_id(event_turn_id)
         if parsed is not None:
             return parsed
@@ -552,140 +749,120 @@ class PukApp:
         return normalized
 
     def _build_compatibility_tools(self, allowed_tools: list[str]) -> list[Tool]:
-        allowed = set(allowed_tools)
+        key = frozenset(allowed_tools)
+        cached = self._compatibility_tools.get(key)
+        if cached is not None:
+            return cached
         tools: list[Tool] = []
-
-        def _create_directory(params: _PathParams, _invocation):
-            target = self._resolve_workspace_path(params.path)
-            self._assert_write_scope(target)
-            target.mkdir(parents=True, exist_ok=True)
-            return f"created directory: {target}"
-
-        def _create_file(params: _CreateFileParams, _invocation):
-            target = self._resolve_workspace_path(params.path)
-            self._assert_write_scope(target)
-            if target.exists():
-                raise FileExistsError(f"Path already exists: {target}")
-            if not target.parent.exists():
-                raise FileNotFoundError(f"Parent directory does not exist: {target.parent}")
-            target.write_text(params.content, encoding="utf-8")
-            return f"created file: {target}"
-
-        def _write_file(params: _WriteFileParams, _invocation):
-            target = self._resolve_workspace_path(params.path)
-            self._assert_write_scope(target)
-            if not target.parent.exists():
-                raise FileNotFoundError(f"Parent directory does not exist: {target.parent}")
-            mode = "a" if params.append else "w"
-            with target.open(mode, encoding="utf-8") as handle:
-                handle.write(params.content)
-            return f"wrote file: {target}"
-
-        def _read_file(params: _ReadFileParams, _invocation):
-            target = self._resolve_workspace_path(params.path)
-            self._assert_read_policy(target)
-            if not target.exists():
-                raise FileNotFoundError(f"Path does not exist: {target}")
-            if target.is_dir():
-                raise IsADirectoryError(f"Path is a directory: {target}")
-            max_bytes = self.config.workspace_settings.max_file_bytes
-            size = target.stat().st_size
-            if size > max_bytes:
-                raise PermissionError(
-                    f"File '{target}' exceeds max_file_bytes ({size} > {max_bytes})."
-                )
-            text = target.read_text(encoding="utf-8")
-            if params.start_line is None and params.end_line is None:
-                return text
-            lines = text.splitlines()
-            start_idx = (params.start_line - 1) if params.start_line is not None else 0
-            end_idx = params.end_line if params.end_line is not None else len(lines)
-            return "\n".join(lines[start_idx:end_idx])
-
-        def _list_directory(params: _ListDirectoryParams, _invocation):
-            target = self._resolve_workspace_path(params.path)
-            if not target.exists():
-                raise FileNotFoundError(f"Path does not exist: {target}")
-            if not target.is_dir():
-                raise NotADirectoryError(f"Path is not a directory: {target}")
-            if self._is_ignored_path(target):
-                raise PermissionError(f"Path '{target}' is ignored by workspace config.")
-            entries = self._iter_directory_entries(
-                target=target,
-                recursive=params.recursive,
-                max_entries=params.max_entries,
-            )
-            workspace = Path(self.config.workspace).resolve()
-            lines = []
-            for entry in entries:
-                rel = entry.relative_to(workspace)
-                suffix = "/" if entry.is_dir() else ""
-                lines.append(f"{rel.as_posix()}{suffix}")
-            return "\n".join(lines)
-
-        if "create_directory" in allowed:
-            tools.append(
-                define_tool(
-                    name="create_directory",
-                    description="Create a directory path inside the workspace.",
-                    handler=_create_directory,
-                    params_type=_PathParams,
-                )
-            )
-        if "create_file" in allowed:
-            tools.append(
-                define_tool(
-                    name="create_file",
-                    description="Create a new file with optional initial content.",
-                    handler=_create_file,
-                    params_type=_CreateFileParams,
-                )
-            )
-        if "write_file" in allowed:
+        for name, (handler_name, params_type, description) in self._COMPATIBILITY_TOOL_DEFS.items():
+            if name not in key:
+                continue
             tools.append(
                 define_tool(
-                    name="write_file",
-                    description="Write or append file content. Creates the file if missing.",
-                    handler=_write_file,
-                    params_type=_WriteFileParams,
+                    name=name,
+                    description=description,
+                    handler=getattr(self, handler_name),
+                    params_type=params_type,
                 )
             )
-        if "read_file" in allowed:
-            tools.append(
-                define_tool(
-                    name="read_file",
-                    description="Read a file from the workspace, optionally by line range.",
-                    handler=_read_file,
-                    params_type=_ReadFileParams,
-                )
+        self._compatibility_tools[key] = tools
+        return tools
+
+    def _tool_create_directory(self, params: _PathParams, _invocation):
+        target = self._resolve_workspace_path(params.path)
+        self._assert_write_scope(target)
+        target.mkdir(parents=True, exist_ok=True)
+        return f"created directory: {target}"
+
+    async def _tool_create_file(self, params: _CreateFileParams, _invocation):
+        target = self._resolve_workspace_path(params.path)
+        self._assert_write_scope(target)
+        if target.exists():
+            raise FileExistsError(f"Path already exists: {target}")
+        if not target.parent.exists():
+            raise FileNotFoundError(f"Parent directory does not exist: {target.parent}")
+        await asyncio.to_thread(_write_text, target, params.content, False)
+        return f"created file: {target}"
+
+    async def _tool_write_file(self, params: _WriteFileParams, _invocation):
+        target = self._resolve_workspace_path(params.path)
+        self._assert_write_scope(target)
+        if not target.parent.exists():
+            raise FileNotFoundError(f"Parent directory does not exist: {target.parent}")
+        await asyncio.to_thread(_write_text, target, params.content, params.append)
+        return f"wrote file: {target}"
+
+    def _tool_read_file(self, params: _ReadFileParams, _invocation):
+        target = self._resolve_workspace_path(params.path)
+        self._assert_read_policy(target)
+        try:
+            st = target.stat()
+        except (FileNotFoundError, NotADirectoryError):
+            raise FileNotFoundError(f"Path does not exist: {target}") from None
+        if stat.S_ISDIR(st.st_mode):
+            raise IsADirectoryError(f"Path is a directory: {target}")
+        max_bytes = self.config.workspace_settings.max_file_bytes
+        size = st.st_size
+        if size > max_bytes:
+            raise PermissionError(
+                f"File '{target}' exceeds max_file_bytes ({size} > {max_bytes})."
             )
-        if "list_directory" in allowed:
-            tools.append(
-                define_tool(
-                    name="list_directory",
-                    description="List directory contents from the workspace.",
-                    handler=_list_directory,
-                    params_type=_ListDirectoryParams,
-                )
+        # One byte past the limit catches a file that grew after the stat.
+        with target.open("rb") as handle:
+            data = handle.read(max_bytes + 1)
+        if len(data) > max_bytes:
+            raise PermissionError(
+                f"File '{target}' exceeds max_file_bytes (>{max_bytes})."
             )
-        return tools
+        text = data.decode("utf-8")
+        if "\r" in text:
+            # Match read_text()'s universal-newline translation.
+            text = text.replace("\r\n", "\n").replace("\r", "\n")
+        if params.start_line is None and params.end_line is None:
+            return text
+        lines = text.splitlines()
+        start_idx = (params.start_line - 1) if params.start_line is not None else 0
+        end_idx = params.end_line if params.end_line is not None else len(lines)
+        return "\n".join(lines[start_idx:end_idx])
+
+    def _tool_list_directory(self, params: _ListDirectoryParams, _invocation):
+        target = self._resolve_workspace_path(params.path)
+        if not target.exists():
+            raise FileNotFoundError(f"Path does not exist: {target}")
+        if not target.is_dir():
+            raise NotADirectoryError(f"Path is not a directory: {target}")
+        if self._is_ignored_path(target):
+            raise PermissionError(f"Path '{target}' is ignored by workspace config.")
+        entries = self._iter_directory_entries(
+            target=target,
+            recursive=params.recursive,
+            max_entries=params.max_entries,
+        )
+        lines = []
+        for entry, is_dir in entries:
+            rel = relative_posix(entry, self._workspace_root)
+            if rel is None:
+                # Outside the root; relative_to raises the same ValueError it always has.
+                rel = entry.relative_to(self._workspace_root).as_posix()
+            lines.append(rel + "/" if is_dir else rel)
+        return "\n".join(lines)
 
     def _resolve_workspace_path(self, raw_path: str) -> Path:
-        workspace = Path(self.config.workspace).resolve()
+        workspace = self._workspace_root
         path = Path(raw_path)
         if not path.is_absolute():
             candidate = workspace / path
         else:
             candidate = path
         resolved = candidate.resolve()
-        if not self.config.workspace_settings.allow_outside_root and not resolved.is_relative_to(
-            workspace
+        if not self.config.workspace_settings.allow_outside_root and not is_within(
+            resolved, workspace
         ):
             raise PermissionError(f"Path '{raw_path}' is outside the workspace.")
         if (
             not self.config.workspace_settings.follow_symlinks
-            and candidate.is_relative_to(workspace)
-            and not resolved.is_relative_to(workspace)
+            and is_within(candidate, workspace)
+            and not is_within(resolved, workspace)
         ):
             raise PermissionError(f"Path '{raw_path}' escapes the workspace via symlink.")
         return resolved
@@ -694,55 +871,79 @@ class PukApp:
         if self._is_ignored_path(path):
             raise PermissionError(f"Path '{path}' is ignored by workspace config.")
         if not self._is_allowed_by_globs(path):
-            raise PermissionError(f"Path '{path}' is not allowed by workspace allow/deny globs.")
+            message = f"Path '{path}' is not allowed by workspace allow/deny globs"
+            denied_by = self._matching_deny_glob(path)
+            if denied_by is not None:
+                message += f" (matches deny glob '{denied_by}')"
+            raise PermissionError(message + ".")
 
     def _is_ignored_path(self, path: Path) -> bool:
-        workspace = Path(self.config.workspace).resolve()
-        try:
-            rel = path.relative_to(workspace)
-        except ValueError:
+        rel = relative_posix(path, self._workspace_root)
+        if rel is None:
             return False
-        ignore = set(self.config.workspace_settings.ignore)
-        return any(part in ignore for part in rel.parts)
+        ignore = self._ignore
+        return any(part in ignore for part in rel.split("/"))
+
+    def _glob_subject(self, path: Path) -> str:
+        rel = relative_posix(path, self._workspace_root)
+        return os.path.normcase(path.as_posix() if rel is None else rel)
 
     def _is_allowed_by_globs(self, path: Path) -> bool:
-        workspace = Path(self.config.workspace).resolve()
-        rel = path.as_posix()
-        try:
-            rel = path.relative_to(workspace).as_posix()
-        except ValueError:
-            rel = path.as_posix()
-        deny = self.config.workspace_settings.deny_globs
-        if any(fnmatch.fnmatch(rel, pattern) for pattern in deny):
-            return False
-        allow = self.config.workspace_settings.allow_globs
-        if not allow:
-            return True
-        return any(fnmatch.fnmatch(rel, pattern) for pattern in allow)
+        key = os.fspath(path)
+        verdict = self._glob_verdicts.get(key)
+        if verdict is None:
+            rel = self._glob_subject(path)
+            verdict = self._glob_policy.allows(rel)
+            if len(self._glob_verdicts) >= _GLOB_VERDICT_CACHE_SIZE:
+                self._glob_verdicts.clear()
+            self._glob_verdicts[key] = verdict
+        return verdict
+
+    def _matching_deny_glob(self, path: Path) -> str | None:
+        # Slow path for error messages only: the compiled sets cannot say which glob matched.
+        rel = self._glob_subject(path)
+        for pattern in self.config.workspace_settings.deny_globs:
+            if fnmatch.fnmatch(rel, pattern):
+                return pattern
+        return None
 
     def _iter_directory_entries(
         self,
         target: Path,
         recursive: bool,
         max_entries: int,
-    ) -> list[Path]:
-        entries: list[Path] = []
+    ) -> list[tuple[Path, bool]]:
+        """Return ``(path, is_dir)`` pairs; ``is_dir`` comes from the directory scan."""
+        entries: list[tuple[Path, bool]] = []
+        if is_within(target, self._workspace_root):
+            # The caller already rejected an ignored target and pruned directories are never
+            # entered, so only each entry's own name can still hit the ignore list.
+            ignore = self._ignore
+
+            def is_ignored(parent: Path, name: str) -> bool:
+                return name in ignore
+
+        else:
+            # Listing from outside the workspace: entries may still lead back into it.
+            def is_ignored(parent: Path, name: str) -> bool:
+                return self._is_ignored_path(parent / name)
+
         if not recursive:
-            for entry in sorted(target.iterdir()):
-                if self._is_ignored_path(entry):
-                    continue
-                entries.append(entry)
-                if len(entries) >= max_entries:
-                    break
-            return entries
+            with os.scandir(target) as scanned:
+                dir_entries = heapq.nsmallest(
+                    max_entries,
+                    (item for item in scanned if not is_ignored(target, item.name)),
+                    key=lambda item: item.name,
+                )
+            return [(Path(dir_entry.path), dir_entry.is_dir()) for dir_entry in dir_entries]
         for root, dirs, files in os.walk(target):
             root_path = Path(root)
-            dirs[:] = [d for d in dirs if not self._is_ignored_path(root_path / d)]
+            dirs[:] = [d for d in dirs if not is_ignored(root_path, d)]
+            dir_names = set(dirs)
             for name in sorted(dirs + files):
-                entry = root_path / name
-                if self._is_ignored_path(entry):
+                if is_ignored(root_path, name):
                     continue
-                entries.append(entry)
+                entries.append((root_path / name, name in dir_names))
                 if len(entries) >= max_entries:
                     return entries
         return entries
@@ -750,8 +951,8 @@ class PukApp:
     def _assert_write_scope(self, path: Path) -> None:
         if self.config.write_scope is None:
             return
-        workspace = Path(self.config.workspace).resolve()
-        if not is_path_within_scope(str(path), workspace, self.config.write_scope):
+        workspace = self._workspace_root
+        if not is_path_within_scope(str(path), workspace, self.config.write_scope, workspace):
             raise PermissionError(f"Path '{path}' is outside the allowed write scope.")
 
     async def repl(self) -> None:
@@ -770,17 +971,10 @@ class PukApp:
             while True:
                 raw = await session.prompt_async()
                 stripped = raw.strip()
-                if stripped in {"/exit", "/quit", "quit", "exit"}:
+                if stripped in _EXIT_COMMANDS:
                     return
                 # Local commands (not sent to model)
-                if stripped.startswith("/runs"):
-                    self._cmd_list_runs()
-                    continue
-                if stripped.startswith("/run "):
-                    self._cmd_show_run(stripped.split(" ", 1)[1])
-                    continue
-                if stripped.startswith("/tail "):
-                    self._cmd_tail_run(stripped.split(" ", 1)[1])
+                if self._dispatch_local_command(stripped):
                     continue
                 if stripped:
                     try:
@@ -812,11 +1006,22 @@ class PukApp:
                 return
 
     # ----- local inspection commands -----
+    def _dispatch_local_command(self, line: str) -> bool:
+        head, _, rest = line.partition(" ")
+        command = self._local_commands.get(head)
+        if command is None:
+            return False
+        command(rest.strip())
+        return True
+
     def _cmd_list_runs(self) -> None:
         runs = run_inspect.discover_runs(Path(self.config.workspace))
         print(run_inspect.format_runs_table(runs))
 
     def _cmd_show_run(self, ref: str) -> None:
+        if not ref:
+            print("[runs] Usage: /run <run-id>")
+            return
         try:
             run_dir = run_inspect.resolve_run_ref(Path(self.config.workspace), ref)
             print(run_inspect.format_run_show(run_dir, tail=20))
@@ -824,6 +1029,9 @@ class PukApp:
             print(f"[runs] {exc}")
 
     def _cmd_tail_run(self, ref: str) -> None:
+        if not ref:
+            print("[runs] Usage: /tail <run-id>")
+            return
         try:
             run_dir = run_inspect.resolve_run_ref(Path(self.config.workspace), ref)
             for ev in run_inspect.tail_events(run_dir, follow=False):
@@ -1,15 +1,21 @@
 from __future__ import annotations
 
+import functools
 import logging
 import os
 import platform
 import re
+import threading
+from collections import ChainMap
 from dataclasses import dataclass, field, replace
 from pathlib import Path
+from types import MappingProxyType
 from typing import Any
 
 import tomllib
 
+from puk.paths import is_within
+
 SUPPORTED_PROVIDERS = {"copilot", "openai", "azure", "anthropic"}
 BYOK_PROVIDERS = {"openai", "azure", "anthropic"}
 MODEL_REQUIRED_PROVIDERS = {"openai", "anthropic"}
@@ -19,6 +25,11 @@ _PROVIDER_DEFAULT_API_KEY = {
     "azure": "AZURE_OPENAI_API_KEY",
     "anthropic": "ANTHROPIC_API_KEY",
 }
+# Workspace config filenames in lookup order; .puk.config is the legacy name.
+_WORKSPACE_CONFIG_NAMES = (".puk.toml", ".puk.config")
+# Parsed TOML keyed by path -> (st_mtime_ns, st_size, data); see _load_toml_file.
+_TOML_CACHE: dict[str, tuple[int, int, dict[str, Any]]] = {}
+_TOML_CACHE_LOCK = threading.Lock()
 
 
 @dataclass(frozen=True)
@@ -114,23 +125,67 @@ WORKSPACE_PARAM_MAP = {
 }
 
 
+_LLM_KEY_SET = frozenset(LLM_KEYS)
+_WORKSPACE_PARAM_KEYS = frozenset(WORKSPACE_PARAM_MAP)
+
+_LLM_DEFAULTS = MappingProxyType({key: getattr(LLMSettings(), key) for key in LLM_KEYS})
+_DEFAULT_API_KEY_SENTINEL = _LLM_DEFAULTS["api_key"]
+# List-valued workspace defaults are stored as tuples and copied per resolve.
+_WORKSPACE_DEFAULTS = MappingProxyType(
+    {
+        key: tuple(value) if isinstance(value, list) else value
+        for key, value in vars(WorkspaceSettings()).items()
+        if key in WORKSPACE_KEYS
+    }
+)
+
+
 def _default_llm_values() -> dict[str, Any]:
-    return {key: getattr(LLMSettings(), key) for key in LLM_KEYS}
+    return dict(_LLM_DEFAULTS)
 
 
 def _normalize_llm_layer(layer: dict[str, Any]) -> dict[str, Any]:
-    return {key: value for key, value in layer.items() if key in LLM_KEYS}
+    return {key: value for key, value in layer.items() if key in _LLM_KEY_SET}
 
 
 def _default_workspace_values() -> dict[str, Any]:
-    return {key: getattr(WorkspaceSettings(), key) for key in WORKSPACE_KEYS}
+    return {
+        key: list(value) if isinstance(value, tuple) else value
+        for key, value in _WORKSPACE_DEFAULTS.items()
+    }
 
 
 def _normalize_workspace_layer(layer: dict[str, Any]) -> dict[str, Any]:
     return {key: value for key, value in layer.items() if key in WORKSPACE_KEYS}
 
 
+_SKIP_GLOBAL_CONFIG_ENV = "PUK_SKIP_GLOBAL_CONFIG"
+_TRUTHY_ENV_VALUES = frozenset({"1", "true", "yes"})
+
+
+def env_flag(name: str) -> bool:
+    """Return whether the environment variable ``name`` is set to a truthy value."""
+    return os.environ.get(name, "").strip().lower() in _TRUTHY_ENV_VALUES
+
+
 def get_global_config_path() -> Path | None:
+    """Return the global config path, or ``None`` when it is skipped or absent."""
+    if env_flag(_SKIP_GLOBAL_CONFIG_ENV):
+        return None
+    path = _platform_global_config_path()
+    if path is None or not _global_config_exists(path):
+        return None
+    return path
+
+
+@functools.cache
+def _global_config_exists(path: Path) -> bool:
+    return path.is_file()
+
+
+@functools.cache
+def _platform_global_config_path() -> Path | None:
+    # platform.system() and Path.home() cannot change within a process.
     system = platform.system().lower()
     if system == "windows":
         appdata = os.environ.get("APPDATA")
@@ -142,11 +197,29 @@ def get_global_config_path() -> Path | None:
     return Path.home() / ".config" / "puk" / "puk.toml"
 
 
+def _load_toml_file(path: Path) -> dict[str, Any] | None:
+    """Return the parsed TOML file, or ``None`` if missing; the cached result must not be mutated."""
+    try:
+        handle = open(path, "rb")
+    except FileNotFoundError:
+        return None
+    with handle:
+        stat = os.fstat(handle.fileno())
+        key = os.fspath(path)
+        with _TOML_CACHE_LOCK:
+            cached = _TOML_CACHE.get(key)
+        if cached is not None and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+            return cached[2]
+        data = tomllib.load(handle)
+    with _TOML_CACHE_LOCK:
+        _TOML_CACHE[key] = (stat.st_mtime_ns, stat.st_size, data)
+    return data
+
+
 def load_llm_config_file(path: Path) -> dict[str, Any]:
-    if not path.exists():
+    data = _load_toml_file(path)
+    if data is None:
         return {}
-    content = path.read_bytes()
-    data = tomllib.loads(content.decode("utf-8"))
     llm_section = data.get("llm", {})
     if not isinstance(llm_section, dict):
         raise ValueError(f"Invalid [llm] section in {path}; expected a table.")
@@ -154,53 +227,64 @@ def load_llm_config_file(path: Path) -> dict[str, Any]:
 
 
 def load_workspace_config_file(path: Path) -> dict[str, Any]:
-    if not path.exists():
+    data = _load_toml_file(path)
+    if data is None:
         return {}
-    content = path.read_bytes()
-    data = tomllib.loads(content.decode("utf-8"))
     workspace_section = data.get("workspace", {})
     if not isinstance(workspace_section, dict):
         raise ValueError(f"Invalid [workspace] section in {path}; expected a table.")
     return _normalize_workspace_layer(workspace_section)
 
 
-def resolve_llm_config(workspace: Path, parameters: dict[str, Any]) -> ResolvedLLMConfig:
-    defaults = _default_llm_values()
-    sources = {key: "default" for key in defaults}
+def _merge_layers(
+    layers: list[tuple[str, dict[str, Any]]],
+) -> tuple[dict[str, Any], dict[str, str]]:
+    """Merge layers (highest precedence first) into values plus each key's source layer."""
+    merged = ChainMap(*(layer for _, layer in layers))
+    sources = {
+        key: next(name for name, layer in layers if key in layer)
+        for key in merged
+    }
+    return dict(merged), sources
+
 
+def resolve_llm_config(workspace: Path, parameters: dict[str, Any]) -> ResolvedLLMConfig:
+    global_layer: dict[str, Any] = {}
     global_path = get_global_config_path()
     if global_path:
         global_layer = load_llm_config_file(global_path)
-        for key, value in global_layer.items():
-            defaults[key] = value
-            sources[key] = "global"
 
     workspace_path = workspace / ".puk.toml"
     workspace_layer = load_llm_config_file(workspace_path)
     if not workspace_layer:
         # Backward-compatible fallback for legacy workspace filename.
         workspace_layer = load_llm_config_file(workspace / ".puk.config")
-    for key, value in workspace_layer.items():
-        defaults[key] = value
-        sources[key] = "workspace"
-
-    param_layer = {k: v for k, v in parameters.items() if v is not None}
-    for key, value in param_layer.items():
-        if key not in LLM_KEYS:
-            continue
-        defaults[key] = value
-        sources[key] = "parameter"
-
-    provider = defaults.get("provider")
+
+    param_layer = {
+        key: parameters[key]
+        for key in parameters.keys() & _LLM_KEY_SET
+        if parameters[key] is not None
+    }
+
+    values, sources = _merge_layers(
+        [
+            ("parameter", param_layer),
+            ("workspace", workspace_layer),
+            ("global", global_layer),
+            ("default", _default_llm_values()),
+        ]
+    )
+
+    provider = values.get("provider")
     provider_default_key = _PROVIDER_DEFAULT_API_KEY.get(provider)
     if (
         provider_default_key
         and sources.get("api_key") == "default"
-        and defaults.get("api_key") == LLMSettings().api_key
+        and values.get("api_key") == _DEFAULT_API_KEY_SENTINEL
     ):
-        defaults["api_key"] = provider_default_key
+        values["api_key"] = provider_default_key
 
-    settings = LLMSettings(**defaults)
+    settings = LLMSettings(**values)
     validate_llm_settings(settings)
     return ResolvedLLMConfig(settings=settings, sources=sources)
 
@@ -210,27 +294,28 @@ def resolve_workspace_config(
     parameters: dict[str, Any],
 ) -> ResolvedWorkspaceConfig:
     defaults = _default_workspace_values()
-    sources = {key: "default" for key in defaults}
 
+    global_layer: dict[str, Any] = {}
     global_path = get_global_config_path()
     if global_path:
         global_layer = load_workspace_config_file(global_path)
-        for key, value in global_layer.items():
-            defaults[key] = value
-            sources[key] = "global"
 
     param_layer = {
-        WORKSPACE_PARAM_MAP[key]: value
-        for key, value in parameters.items()
-        if key in WORKSPACE_PARAM_MAP and value is not None
+        WORKSPACE_PARAM_MAP[key]: parameters[key]
+        for key in parameters.keys() & _WORKSPACE_PARAM_KEYS
+        if parameters[key] is not None
     }
-    discover_root_hint = param_layer.get("discover_root", defaults["discover_root"])
+    discover_root_hint = param_layer.get(
+        "discover_root", global_layer.get("discover_root", defaults["discover_root"])
+    )
 
+    invocation_root = workspace.resolve()
     workspace_layer: dict[str, Any] = {}
     workspace_path = workspace / ".puk.toml"
     legacy_path = workspace / ".puk.config"
+    discovered: Path | None = None
     if discover_root_hint:
-        discovered = _find_workspace_config_file(workspace)
+        discovered = _find_workspace_config_file(invocation_root)
         if discovered is not None:
             workspace_layer = load_workspace_config_file(discovered)
     else:
@@ -239,27 +324,32 @@ def resolve_workspace_config(
         elif legacy_path.exists():
             workspace_layer = load_workspace_config_file(legacy_path)
 
-    for key, value in workspace_layer.items():
-        defaults[key] = value
-        sources[key] = "workspace"
-
-    for key, value in param_layer.items():
-        defaults[key] = value
-        sources[key] = "parameter"
-
-    settings = WorkspaceSettings(**defaults)
+    values, sources = _merge_layers(
+        [
+            ("parameter", param_layer),
+            ("workspace", workspace_layer),
+            ("global", global_layer),
+            ("default", defaults),
+        ]
+    )
+    settings = WorkspaceSettings(**values)
     validate_workspace_settings(settings)
 
-    base_root = workspace
+    base_root = invocation_root
     if settings.discover_root:
-        discovered = _find_workspace_config_file(workspace)
+        # The walk above is reused; only walk now if the config file turned discovery on.
+        if not discover_root_hint:
+            discovered = _find_workspace_config_file(invocation_root)
         if discovered is not None:
             base_root = discovered.parent
 
     root_value = settings.root
-    resolved_root = (base_root / root_value).resolve()
-    invocation_root = workspace.resolve()
-    if not settings.allow_outside_root and not _is_relative_to(resolved_root, invocation_root):
+    if root_value == ".":
+        # base_root is invocation_root or the directory of a config found walking up from it; both are resolved.
+        resolved_root = base_root
+    else:
+        resolved_root = (base_root / root_value).resolve()
+    if not settings.allow_outside_root and not is_within(resolved_root, invocation_root):
         raise ValueError(
             "Workspace root must remain within the invocation workspace when allow_outside_root is false. "
             f"Resolved root '{resolved_root}' is outside '{invocation_root}'."
@@ -291,69 +381,75 @@ def validate_llm_settings(settings: LLMSettings) -> None:
         raise ValueError("BYOK providers require a non-empty api_key value.")
 
 
+_WS_BOOL_FIELDS = ("discover_root", "allow_outside_root", "follow_symlinks")
+_WS_LIST_FIELDS = ("ignore", "allow_globs", "deny_globs")
+
+
+def _require_bool(name: str, value: Any) -> None:
+    if not isinstance(value, bool):
+        raise ValueError(f"Workspace {name} must be a boolean.")
+
+
+def _require_str_list(name: str, value: Any) -> None:
+    if not isinstance(value, list) or not all(
+        isinstance(item, str) and item.strip() for item in value
+    ):
+        raise ValueError(f"Workspace {name} must be a list of non-empty strings.")
+
+
 def validate_workspace_settings(settings: WorkspaceSettings) -> None:
     if not isinstance(settings.root, str) or not settings.root.strip():
         raise ValueError("Workspace root must be a non-empty path string.")
-    for name in ("discover_root", "allow_outside_root", "follow_symlinks"):
-        value = getattr(settings, name)
-        if not isinstance(value, bool):
-            raise ValueError(f"Workspace {name} must be a boolean.")
+    for name in _WS_BOOL_FIELDS:
+        _require_bool(name, getattr(settings, name))
     if not isinstance(settings.max_file_bytes, int) or settings.max_file_bytes <= 0:
         raise ValueError("Workspace max_file_bytes must be a positive integer.")
-    for field in ("ignore", "allow_globs", "deny_globs"):
-        value = getattr(settings, field)
-        if not isinstance(value, list):
-            raise ValueError(f"Workspace {field} must be a list of non-empty strings.")
-        for item in value:
-            if not isinstance(item, str) or not item.strip():
-                raise ValueError(f"Workspace {field} must be a list of non-empty strings.")
+    for name in _WS_LIST_FIELDS:
+        _require_str_list(name, getattr(settings, name))
+
+
+def _looks_like_env_name(value: str) -> bool:
+    if not value or not value.isascii() or not value.isidentifier():
+        return False
+    return bool(_ENV_NAME_PATTERN.match(value))
 
 
 def log_resolved_llm_config(resolved: ResolvedLLMConfig) -> None:
     logger = logging.getLogger("puk")
+    if not logger.isEnabledFor(logging.INFO):
+        return
     settings = resolved.settings
-    logger.info(
-        "LLM config resolved: provider=%s model=%s",
-        settings.provider,
-        settings.model or "<auto>",
-    )
+    api_key = settings.api_key
+    if isinstance(api_key, str) and not _looks_like_env_name(api_key):
+        api_key = "<redacted>"
+    lines = [f"LLM config resolved: provider={settings.provider} model={settings.model or '<auto>'}"]
     for key in LLM_KEYS:
-        value = getattr(settings, key)
-        if key == "api_key" and isinstance(value, str) and not _ENV_NAME_PATTERN.match(value):
-            value = "<redacted>"
-        logger.info("LLM config %s=%s (source=%s)", key, value, resolved.sources.get(key, "default"))
+        value = api_key if key == "api_key" else getattr(settings, key)
+        lines.append(f"LLM config {key}={value} (source={resolved.sources.get(key, 'default')})")
+    logger.info("\n".join(lines))
 
 
 def log_resolved_workspace_config(resolved: ResolvedWorkspaceConfig) -> None:
     logger = logging.getLogger("puk")
+    if not logger.isEnabledFor(logging.INFO):
+        return
     settings = resolved.settings
-    logger.info("Workspace config resolved: root=%s", settings.root)
+    lines = [f"Workspace config resolved: root={settings.root}"]
     for key in WORKSPACE_KEYS:
         value = getattr(settings, key)
-        logger.info(
-            "Workspace config %s=%s (source=%s)",
-            key,
-            value,
-            resolved.sources.get(key, "default"),
-        )
+        lines.append(f"Workspace config {key}={value} (source={resolved.sources.get(key, 'default')})")
+    logger.info("\n".join(lines))
 
 
 def _find_workspace_config_file(start: Path) -> Path | None:
-    current = start.resolve()
-    candidates = [current, *current.parents]
-    for directory in candidates:
-        primary = directory / ".puk.toml"
-        if primary.exists():
-            return primary
-        legacy = directory / ".puk.config"
-        if legacy.exists():
-            return legacy
-    return None
-
-
-def _is_relative_to(path: Path, other: Path) -> bool:
-    try:
-        path.relative_to(other)
-        return True
-    except ValueError:
-        return False
+    # ``start`` is already resolved.
+    current = os.fspath(start)
+    while True:
+        for name in _WORKSPACE_CONFIG_NAMES:
+            candidate = os.path.join(current, name)
+            if os.path.isfile(candidate):
+                return Path(candidate)
+        parent = os.path.dirname(current)
+        if parent == current:
+            return None
+        current = parent
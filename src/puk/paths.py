@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+
+def relative_posix(path: Path, root: Path) -> str | None:
+    """Return ``path`` relative to ``root`` as a POSIX string ("." for root), else ``None``."""
+    # Lexical comparison; normcase keeps Windows case-insensitive like PurePath.
+    path_str = os.fspath(path)
+    path_key = os.path.normcase(path_str)
+    root_key = os.path.normcase(os.fspath(root))
+    if path_key == root_key:
+        return "."
+    prefix_len = len(root_key) if root_key.endswith(os.sep) else len(root_key) + 1
+    if not path_key.startswith(root_key) or path_key[prefix_len - 1] != os.sep:
+        return None
+    rel = path_str[prefix_len:]
+    return rel.replace(os.sep, "/") if os.sep != "/" else rel
+
+
+def is_within(path: Path, root: Path) -> bool:
+    """Return whether ``path`` is ``root`` or lies beneath it."""
+    return relative_posix(path, root) is not None
@@ -1,14 +1,34 @@
 from __future__ import annotations
 
+import asyncio
 import json
+import os
 from pathlib import Path
 from typing import Any
 
 from puk.app import PukApp, PukConfig
 from puk.config import LLMSettings, WorkspaceSettings
+from puk.paths import is_within
 from puk.playbooks import Playbook, PlaybookValidationError, extract_plan_from_text, render_body
 from puk.run import RunRecorder
 
+_RUNTIME_NOTE = (
+    "Runtime note: Parameter values have already been resolved and validated by the runner.\n"
+    "Do not perform separate permission/probe checks; proceed directly with the playbook steps.\n"
+    "Use directory-oriented tools for directories and file-oriented tools for files.\n"
+    "Do not use file-view tools on directory paths (for example repo_root or output_dir).\n"
+    "For repository enumeration, use glob/list-directory style tools.\n"
+)
+_PLAN_BLOCK = (
+    "Execution mode: PLAN\n"
+    "Do not call tools or modify files. Produce a JSON plan with this structure:\n"
+    '{"steps":[{"description":"...", "tools":["tool.name"], "files":["path/relative/to/workspace"]}]}\n'
+)
+_APPLY_BLOCK = (
+    "Execution mode: APPLY\n"
+    "Use only the allowed tools and stay within the write scope.\n"
+)
+
 
 def run_playbook_sync(
     workspace: Path,
@@ -38,8 +58,6 @@ def run_playbook_sync(
     )
     app = PukApp(config, run_recorder=recorder)
     prompt = _build_prompt(playbook, parameters, mode)
-    import asyncio
-
     asyncio.run(_run_playbook(app, recorder, playbook, parameters, mode, prompt))
 
 
@@ -84,34 +102,23 @@ async def _run_playbook(
 
 
 def _build_prompt(playbook: Playbook, parameters: dict[str, Any], mode: str) -> str:
-    param_lines = "\n".join(f"- {key}: {value}" for key, value in parameters.items()) or "- (none)"
-    rendered_body = render_body(playbook.body, parameters)
-    if mode == "plan":
-        mode_block = (
-            "Execution mode: PLAN\n"
-            "Do not call tools or modify files. Produce a JSON plan with this structure:\n"
-            '{"steps":[{"description":"...", "tools":["tool.name"], "files":["path/relative/to/workspace"]}]}\n'
-        )
-    else:
-        mode_block = (
-            "Execution mode: APPLY\n"
-            "Use only the allowed tools and stay within the write scope.\n"
-        )
-    return (
-        f"Playbook: {playbook.id} (v{playbook.version})\n"
-        f"Description: {playbook.description}\n"
-        f"Parameters:\n{param_lines}\n"
-        f"Allowed tools: {', '.join(playbook.allowed_tools)}\n"
-        f"Write scope: {', '.join(playbook.write_scope)}\n"
-        "Runtime note: Parameter values have already been resolved and validated by the runner.\n"
-        "Do not perform separate permission/probe checks; proceed directly with the playbook steps.\n"
-        "Use directory-oriented tools for directories and file-oriented tools for files.\n"
-        "Do not use file-view tools on directory paths (for example repo_root or output_dir).\n"
-        "For repository enumeration, use glob/list-directory style tools.\n"
-        f"{mode_block}\n"
-        "Playbook instructions:\n"
-        f"{rendered_body}\n"
+    param_lines = (
+        "\n".join(["- " + str(key) + ": " + str(value) for key, value in parameters.items()])
+        or "- (none)"
     )
+    parts = [
+        f"Playbook: {playbook.id} (v{playbook.version})\n",
+        f"Description: {playbook.description}\n",
+        f"Parameters:\n{param_lines}\n",
+        f"Allowed tools: {playbook.allowed_tools_str}\n",
+        f"Write scope: {playbook.write_scope_str}\n",
+        _RUNTIME_NOTE,
+        _PLAN_BLOCK if mode == "plan" else _APPLY_BLOCK,
+        "\nPlaybook instructions:\n",
+        render_body(playbook.body, parameters),
+        "\n",
+    ]
+    return "".join(parts)
 
 
 def _prepare_output_directory(
@@ -128,17 +135,15 @@ def _prepare_output_directory(
     else:
         candidate = output_dir
     output_dir = candidate.resolve()
-    if (
-        not workspace_settings.allow_outside_root
-        and not output_dir.is_relative_to(workspace.resolve())
-    ):
+    workspace_resolved = workspace.resolve()
+    if not workspace_settings.allow_outside_root and not is_within(output_dir, workspace_resolved):
         raise PlaybookValidationError(
             f"output_dir '{output_dir}' must resolve within the workspace."
         )
     if (
         not workspace_settings.follow_symlinks
-        and candidate.is_relative_to(workspace.resolve())
-        and not output_dir.is_relative_to(workspace.resolve())
+        and is_within(candidate, workspace_resolved)
+        and not is_within(output_dir, workspace_resolved)
     ):
         raise PlaybookValidationError(
             f"output_dir '{output_dir}' escapes the workspace via symlink."
@@ -162,22 +167,37 @@ def _persist_plan(recorder: RunRecorder, output: str) -> None:
     try:
         plan = extract_plan_from_text(output)
         plan_path = artifacts_dir / "plan.json"
-        plan_path.write_text(json.dumps(plan, indent=2), encoding="utf-8")
-        recorder.record_artifact("artifacts/plan.json", turn_id=recorder.turn_id, summary="plan")
-        recorder.record_event("playbook.plan", {"artifact": "artifacts/plan.json"})
+        # json.dumps escapes non-ASCII by default, so the encoded text is plain ASCII.
+        plan_path.write_bytes(json.dumps(plan, indent=2).encode("ascii"))
+        recorder.record_artifact_and_event(
+            "artifacts/plan.json",
+            turn_id=recorder.turn_id,
+            summary="plan",
+            event_type="playbook.plan",
+            data={"artifact": "artifacts/plan.json"},
+        )
     except PlaybookValidationError as exc:
         plan_path = artifacts_dir / "plan.md"
         plan_path.write_text(output, encoding="utf-8")
-        recorder.record_artifact("artifacts/plan.md", turn_id=recorder.turn_id, summary="plan")
-        recorder.record_event("playbook.plan", {"artifact": "artifacts/plan.md", "error": str(exc)})
+        recorder.record_artifact_and_event(
+            "artifacts/plan.md",
+            turn_id=recorder.turn_id,
+            summary="plan",
+            event_type="playbook.plan",
+            data={"artifact": "artifacts/plan.md", "error": str(exc)},
+        )
         raise
 
 
 def _find_plan_artifact(paths) -> str | None:
     if paths is None:
         return None
+    try:
+        with os.scandir(paths.artifacts_dir) as entries:
+            names = {entry.name for entry in entries}
+    except FileNotFoundError:
+        return None
     for name in ("plan.json", "plan.md"):
-        candidate = paths.artifacts_dir / name
-        if candidate.exists():
+        if name in names:
             return f"artifacts/{name}"
     return None
@@ -1,17 +1,24 @@
 from __future__ import annotations
 
 import fnmatch
+import functools
 import json
+import os
 import re
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any
 
-import yaml
+from puk.paths import is_within, relative_posix
 
 
 _FRONT_MATTER_BOUNDARY = "---"
 _JSON_FENCE = re.compile(r"```(?:json)?\n(.*?)```", re.DOTALL | re.IGNORECASE)
+_MAX_JSON_DECODE_FAILURES = 32
+_NO_JSON = object()
+_JSON_DECODER = json.JSONDecoder()
+# Parsed playbooks keyed by path -> (st_mtime_ns, st_size, playbook).
+_PLAYBOOK_CACHE: dict[str, tuple[int, int, Playbook]] = {}
 
 
 class PlaybookValidationError(ValueError):
@@ -28,7 +35,7 @@ class ParameterSpec:
     enum_values: list[str] | None = None
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Playbook:
     id: str
     version: str
@@ -39,14 +46,32 @@ class Playbook:
     run_mode: str
     body: str
     path: Path
+    # Prompt-ready renderings of the lists above.
+    allowed_tools_str: str = field(init=False, repr=False, compare=False)
+    write_scope_str: str = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "allowed_tools_str", ", ".join(self.allowed_tools))
+        object.__setattr__(self, "write_scope_str", ", ".join(self.write_scope))
 
 
 def load_playbook(path: Path) -> Playbook:
-    if not path.exists():
-        raise PlaybookValidationError(f"Playbook file '{path}' does not exist.")
-    text = path.read_text(encoding="utf-8")
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        raise PlaybookValidationError(f"Playbook file '{path}' does not exist.") from None
+    key = str(path)
+    cached = _PLAYBOOK_CACHE.get(key)
+    if cached is not None and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+        return cached[2]
+    playbook = _parse_playbook(path.read_text(encoding="utf-8"), path)
+    _PLAYBOOK_CACHE[key] = (stat.st_mtime_ns, stat.st_size, playbook)
+    return playbook
+
+
+def _parse_playbook(text: str, path: Path) -> Playbook:
     front_matter, body = _split_front_matter(text, path)
-    data = yaml.safe_load(front_matter) or {}
+    data = _load_yaml(front_matter) or {}
     if not isinstance(data, dict):
         raise PlaybookValidationError("Playbook front-matter must be a YAML mapping.")
     required = ["id", "version", "description", "parameters", "allowed_tools", "write_scope", "run_mode"]
@@ -84,6 +109,7 @@ def resolve_parameters(
     if unknown:
         raise PlaybookValidationError(f"Unknown parameter(s): {', '.join(sorted(unknown))}.")
     resolved: dict[str, Any] = {}
+    workspace_resolved: Path | None = None
     for name, spec in specs.items():
         if name in raw_params:
             value = raw_params[name]
@@ -93,10 +119,13 @@ def resolve_parameters(
             raise PlaybookValidationError(f"Missing required parameter '{name}'.")
         else:
             continue
+        if spec.type == "path" and workspace_resolved is None:
+            workspace_resolved = workspace.resolve()
         resolved[name] = _convert_param_value(
             spec,
             value,
             workspace,
+            workspace_resolved=workspace_resolved,
             allow_outside_root=allow_outside_root,
             follow_symlinks=follow_symlinks,
         )
@@ -104,10 +133,10 @@ def resolve_parameters(
 
 
 def render_body(body: str, params: dict[str, Any]) -> str:
-    rendered = body
-    for key, value in params.items():
-        rendered = rendered.replace(f"{{{{{key}}}}}", str(value))
-    return rendered
+    if not params:
+        return body
+    pattern = _placeholder_pattern(frozenset(params))
+    return pattern.sub(lambda match: str(params[match.group(1)]), body)
 
 
 def extract_plan_from_text(text: str) -> dict[str, Any]:
@@ -119,24 +148,36 @@ def extract_plan_from_text(text: str) -> dict[str, Any]:
     return payload
 
 
-def is_path_within_scope(path: str, workspace: Path, write_scope: list[str]) -> bool:
+def is_path_within_scope(
+    path: str,
+    workspace: Path,
+    write_scope: list[str],
+    workspace_resolved: Path | None = None,
+) -> bool:
     if not write_scope:
         return False
     resolved = Path(path)
     if not resolved.is_absolute():
         resolved = (workspace / resolved).resolve()
-    workspace_resolved = workspace.resolve()
-    if not _is_relative_to(resolved, workspace_resolved):
+    if workspace_resolved is None:
+        workspace_resolved = workspace.resolve()
+    rel = relative_posix(resolved, workspace_resolved)
+    if rel is None:
         return False
-    rel = resolved.relative_to(workspace_resolved).as_posix()
+    return _compile_scope(tuple(write_scope)).fullmatch(os.path.normcase(rel)) is not None
+
+
+@functools.lru_cache(maxsize=64)
+def _compile_scope(write_scope: tuple[str, ...]) -> re.Pattern[str]:
+    # "base/**" also covers "base" itself, unlike fnmatch.
+    alternatives = []
     for pattern in write_scope:
-        if fnmatch.fnmatch(rel, pattern):
-            return True
+        alternatives.append(fnmatch.translate(os.path.normcase(pattern)))
         if pattern.endswith("/**"):
             base = pattern[:-3].rstrip("/")
-            if base and (rel == base or rel.startswith(f"{base}/")):
-                return True
-    return False
+            if base:
+                alternatives.append(r"(?s:" + re.escape(os.path.normcase(base)) + r"(?:/.*)?)\Z")
+    return re.compile("|".join(f"(?:{alternative})" for alternative in alternatives))
 
 
 def parse_param_assignments(assignments: list[str]) -> dict[str, str]:
@@ -153,17 +194,45 @@ def parse_param_assignments(assignments: list[str]) -> dict[str, str]:
 
 
 def _split_front_matter(text: str, path: Path) -> tuple[str, str]:
-    lines = text.splitlines()
-    if not lines or lines[0].strip() != _FRONT_MATTER_BOUNDARY:
+    if "\r" in text:
+        text = text.replace("\r\n", "\n")
+    first_end = text.find("\n")
+    first_line = text if first_end == -1 else text[:first_end]
+    if first_line.strip() != _FRONT_MATTER_BOUNDARY:
         raise PlaybookValidationError(f"Playbook '{path}' missing YAML front-matter.")
-    for idx in range(1, len(lines)):
-        if lines[idx].strip() == _FRONT_MATTER_BOUNDARY:
-            front = "\n".join(lines[1:idx])
-            body = "\n".join(lines[idx + 1 :]).lstrip("\n")
-            return front, body
+    front_start = first_end + 1
+    pos = front_start
+    while first_end != -1:
+        candidate = text.find(_FRONT_MATTER_BOUNDARY, pos)
+        if candidate == -1:
+            break
+        line_start = text.rfind("\n", 0, candidate) + 1
+        line_end = text.find("\n", candidate)
+        if line_end == -1:
+            line_end = len(text)
+        if text[line_start:line_end].strip() == _FRONT_MATTER_BOUNDARY:
+            front = text[front_start : max(front_start, line_start - 1)]
+            body = text[line_end + 1 :]
+            if body.endswith("\n"):
+                body = body[:-1]
+            return front, body.lstrip("\n")
+        pos = line_end
     raise PlaybookValidationError(f"Playbook '{path}' front-matter is not closed.")
 
 
+def _load_yaml(text: str) -> Any:
+    import yaml
+
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)  # CSafeLoader needs libyaml
+    return yaml.load(text, Loader=loader)
+
+
+@functools.lru_cache(maxsize=64)
+def _placeholder_pattern(keys: frozenset[str]) -> re.Pattern[str]:
+    alternatives = "|".join(re.escape(key) for key in sorted(keys))
+    return re.compile(r"\{\{(" + alternatives + r")\}\}")
+
+
 def _parse_parameters(raw: Any) -> dict[str, ParameterSpec]:
     if not isinstance(raw, dict):
         raise PlaybookValidationError("Playbook parameters must be a mapping.")
@@ -201,6 +270,7 @@ def _convert_param_value(
     value: Any,
     workspace: Path,
     *,
+    workspace_resolved: Path | None = None,
     allow_outside_root: bool,
     follow_symlinks: bool,
 ) -> Any:
@@ -241,16 +311,14 @@ def _convert_param_value(
         else:
             candidate = resolved
         resolved = candidate.resolve()
-        workspace_resolved = workspace.resolve()
-        if not allow_outside_root and not _is_relative_to(resolved, workspace_resolved):
+        if workspace_resolved is None:
+            workspace_resolved = workspace.resolve()
+        inside = relative_posix(resolved, workspace_resolved) is not None
+        if not allow_outside_root and not inside:
             raise PlaybookValidationError(
                 f"Parameter '{spec.name}' must resolve within the workspace."
             )
-        if (
-            not follow_symlinks
-            and candidate.is_relative_to(workspace_resolved)
-            and not _is_relative_to(resolved, workspace_resolved)
-        ):
+        if not follow_symlinks and not inside and is_within(candidate, workspace_resolved):
             raise PlaybookValidationError(
                 f"Parameter '{spec.name}' escapes the workspace via symlink."
             )
@@ -262,28 +330,41 @@ def _extract_json(text: str) -> Any:
     text = text.strip()
     if not text:
         raise PlaybookValidationError("Plan output is empty.")
-    fenced = _JSON_FENCE.findall(text)
-    candidates = []
-    if fenced:
-        candidates.extend(fenced)
-    candidates.append(text)
-    for candidate in candidates:
+    try:
+        return json.loads(text)
+    except Exception:
+        pass
+    # A reply may carry other JSON (or bracketed prose) around the plan, so keep looking for
+    # an object with "steps" and only fall back to the first value that decoded.
+    fallback: Any = _NO_JSON
+    for fence in _JSON_FENCE.finditer(text):
         try:
-            return json.loads(candidate)
+            payload = json.loads(fence.group(1))
         except Exception:
             continue
-    match = re.search(r"(\{.*\}|\[.*\])", text, re.DOTALL)
-    if match:
+        if _is_plan_payload(payload):
+            return payload
+        if fallback is _NO_JSON:
+            fallback = payload
+    # Failed openers are capped so unbalanced text cannot make the scan quadratic.
+    failures = 0
+    start = text.find("{")
+    while start != -1 and failures < _MAX_JSON_DECODE_FAILURES:
         try:
-            return json.loads(match.group(1))
-        except Exception as exc:
-            raise PlaybookValidationError("Plan output is not valid JSON.") from exc
+            payload, end = _JSON_DECODER.raw_decode(text, start)
+        except (ValueError, RecursionError):
+            failures += 1
+            start = text.find("{", start + 1)
+            continue
+        if _is_plan_payload(payload):
+            return payload
+        if fallback is _NO_JSON:
+            fallback = payload
+        start = text.find("{", end)
+    if fallback is not _NO_JSON:
+        return fallback
     raise PlaybookValidationError("Plan output is not valid JSON.")
 
 
-def _is_relative_to(path: Path, other: Path) -> bool:
-    try:
-        path.relative_to(other)
-        return True
-    except ValueError:
-        return False
+def _is_plan_payload(payload: Any) -> bool:
+    return isinstance(payload, dict) and "steps" in payload
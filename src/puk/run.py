@@ -2,18 +2,28 @@ from __future__ import annotations
 
 import json
 import os
+import time
 import uuid
 from dataclasses import dataclass
-from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
 
+from puk.config import env_flag
+from puk.runs import find_run_dir, record_run_in_index
+
 
 ISO_FMT = "%Y-%m-%dT%H-%M-%SZ"
+# Set PUK_LEGACY_EVENTS=1 to also emit a status.change record after session.end.
+_LEGACY_EVENTS_ENV = "PUK_LEGACY_EVENTS"
 
 
 def _utcnow() -> str:
-    return datetime.now(timezone.utc).strftime(ISO_FMT)
+    # Same output as datetime.now(timezone.utc).strftime(ISO_FMT) without a tz-aware datetime.
+    now = time.gmtime()
+    return (
+        f"{now.tm_year:04d}-{now.tm_mon:02d}-{now.tm_mday:02d}"
+        f"T{now.tm_hour:02d}-{now.tm_min:02d}-{now.tm_sec:02d}Z"
+    )
 
 
 def _safe_slug(text: str | None, max_len: int = 32) -> str:
@@ -24,6 +34,20 @@ def _safe_slug(text: str | None, max_len: int = 32) -> str:
     return cleaned[:max_len]
 
 
+def _read_last_line(path: Path, chunk_size: int = 4096) -> bytes:
+    with path.open("rb") as handle:
+        position = handle.seek(0, os.SEEK_END)
+        data = b""
+        while position > 0:
+            step = min(chunk_size, position)
+            position -= step
+            handle.seek(position)
+            data = handle.read(step) + data
+            if b"\n" in data.rstrip(b"\n"):
+                break
+    return data.rstrip(b"\n").rpartition(b"\n")[2]
+
+
 def _pid_is_alive(pid: int) -> bool:
     if pid <= 0:
         return False
@@ -38,7 +62,7 @@ def _pid_is_alive(pid: int) -> bool:
     return True
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class RunPaths:
     root: Path
     manifest: Path
@@ -66,7 +90,9 @@ class RunRecorder:
         self.seq = 0
         self.turn_id = 0
         self._lock_handle = None
+        self._events_handle = None
         self._prior_status: str | None = None
+        self._legacy_events = env_flag(_LEGACY_EVENTS_ENV)
 
     # ---------- public API ----------
     def start(self, title_slug: str | None = None) -> None:
@@ -113,7 +139,9 @@ class RunRecorder:
                     "max_output_tokens": self.llm.max_output_tokens,
                 },
             }
-            self._write_manifest(self.paths.manifest, manifest)
+            # Nothing can be reading a manifest in a directory created just above.
+            self._write_manifest(self.paths.manifest, manifest, durable=False)
+            record_run_in_index(runs_root, self.run_id, run_root.name)
         self._acquire_lock()
         self._append_event(
             "session.start",
@@ -129,12 +157,16 @@ class RunRecorder:
     def close(self, status: str, reason: str) -> None:
         if not self.paths:
             return
-        self._append_event("session.end", {"status": status, "reason": reason})
-        self._append_event("status.change", {"status": status, "reason": reason})
+        # session.end carries the final status; status.change is the old duplicate record.
+        events = [("session.end", {"status": status, "reason": reason}, None)]
+        if self._legacy_events:
+            events.append(("status.change", {"status": status, "reason": reason}, None))
+        self._append_events(events)
         manifest = self._read_manifest(self.paths.manifest)
         manifest["status"] = status
         manifest["updated_at"] = _utcnow()
         self._write_manifest(self.paths.manifest, manifest)
+        self._close_events()
         self._release_lock()
 
     def next_turn_id(self) -> int:
@@ -194,6 +226,21 @@ class RunRecorder:
     def record_event(self, event_type: str, data: dict[str, Any], turn_id: int | None = None) -> None:
         self._append_event(event_type, data, turn_id=turn_id)
 
+    def record_artifact_and_event(
+        self,
+        relative_path: str,
+        turn_id: int,
+        summary: str | None,
+        event_type: str,
+        data: dict[str, Any],
+    ) -> None:
+        self._append_events(
+            [
+                ("artifact.write", {"path": relative_path, "summary": summary or ""}, turn_id),
+                (event_type, data, None),
+            ]
+        )
+
     # ---------- internal helpers ----------
     def _acquire_lock(self) -> None:
         if not self.paths:
@@ -257,19 +304,17 @@ class RunRecorder:
         return paths, manifest
 
     def _find_run_by_id(self, runs_root: Path, run_id: str) -> Path | None:
-        if not runs_root.exists():
-            return None
-        for entry in runs_root.iterdir():
-            manifest_path = entry / "run.json"
-            if manifest_path.exists():
-                manifest = self._read_manifest(manifest_path)
-                if manifest.get("run_id") == run_id:
-                    return entry
-        return None
+        return find_run_dir(runs_root, run_id)
 
     def _load_last_seq(self, events_path: Path) -> int:
         if not events_path.exists():
             return 0
+        # seq only grows, so the last line normally carries the answer; scan everything
+        # only when that line does not parse.
+        try:
+            return int(json.loads(_read_last_line(events_path)).get("seq", 0))
+        except Exception:
+            pass
         last_seq = 0
         with events_path.open("r", encoding="utf-8") as handle:
             for line in handle:
@@ -281,25 +326,46 @@ class RunRecorder:
         return last_seq
 
     def _append_event(self, event_type: str, data: dict[str, Any], turn_id: int | None = None) -> None:
+        self._append_events([(event_type, data, turn_id)])
+
+    def _append_events(self, events: list[tuple[str, dict[str, Any], int | None]]) -> None:
         if not self.paths:
             return
-        self.seq += 1
-        record = {
-            "timestamp": _utcnow(),
-            "seq": self.seq,
-            "type": event_type,
-            "run_id": self.run_id,
-            "turn_id": turn_id,
-            "data": data,
-        }
-        line = json.dumps(record, ensure_ascii=True)
-        with self.paths.events.open("a", encoding="utf-8") as handle:
-            handle.write(line + "\n")
-
-    def _write_manifest(self, path: Path, manifest: dict[str, Any]) -> None:
-        tmp = path.with_suffix(".tmp")
-        tmp.write_text(json.dumps(manifest, ensure_ascii=True, indent=2), encoding="utf-8")
-        tmp.replace(path)
+        lines = []
+        for event_type, data, turn_id in events:
+            self.seq += 1
+            record = {
+                "timestamp": _utcnow(),
+                "seq": self.seq,
+                "type": event_type,
+                "run_id": self.run_id,
+                "turn_id": turn_id,
+                "data": data,
+            }
+            lines.append(json.dumps(record, ensure_ascii=True))
+        payload = ("\n".join(lines) + "\n").encode("ascii")
+        # The log stays open between events; flushing per batch keeps `puk runs tail --follow` live.
+        if self._events_handle is None:
+            self._events_handle = self.paths.events.open("ab")
+        self._events_handle.write(payload)
+        self._events_handle.flush()
+
+    def _close_events(self) -> None:
+        if self._events_handle is not None:
+            self._events_handle.close()
+            self._events_handle = None
+
+    def _write_manifest(self, path: Path, manifest: dict[str, Any], durable: bool = True) -> None:
+        payload = json.dumps(manifest, ensure_ascii=True, indent=2).encode("ascii")
+        target = os.fspath(path)
+        if not durable:
+            with open(target, "wb") as handle:
+                handle.write(payload)
+            return
+        tmp = os.fspath(path.with_suffix(".tmp"))
+        with open(tmp, "wb") as handle:
+            handle.write(payload)
+        os.replace(tmp, target)
 
     def _read_manifest(self, path: Path) -> dict[str, Any]:
         if not path.exists():
@@ -1,13 +1,15 @@
 from __future__ import annotations
 
 import json
+import os
 import time
+from collections import deque
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Iterable, Iterator
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class RunInfo:
     run_id: str
     dir: Path
@@ -30,22 +32,27 @@ def _load_manifest(path: Path) -> dict:
 
 
 def discover_runs(workspace: Path) -> list[RunInfo]:
-    root = _runs_root(workspace)
-    if not root.exists():
+    runs = _scan_runs(_runs_root(workspace))
+    runs.sort(key=lambda r: r.updated_at, reverse=True)
+    return runs
+
+
+def _scan_runs(root: Path) -> list[RunInfo]:
+    try:
+        with os.scandir(root) as scanned:
+            run_dirs = [entry.path for entry in scanned if entry.is_dir()]
+    except FileNotFoundError:
         return []
     runs: list[RunInfo] = []
-    for entry in root.iterdir():
-        manifest_path = entry / "run.json"
-        if not manifest_path.exists():
-            continue
+    for run_dir in run_dirs:
         try:
-            manifest = _load_manifest(manifest_path)
+            manifest = _load_manifest(Path(run_dir, "run.json"))
         except Exception:
             continue
         runs.append(
             RunInfo(
                 run_id=manifest.get("run_id", ""),
-                dir=entry,
+                dir=Path(run_dir),
                 created_at=manifest.get("created_at", ""),
                 updated_at=manifest.get("updated_at", ""),
                 status=manifest.get("status", ""),
@@ -54,15 +61,61 @@ def discover_runs(workspace: Path) -> list[RunInfo]:
                 workspace=manifest.get("workspace", ""),
             )
         )
-    runs.sort(key=lambda r: r.updated_at, reverse=True)
     return runs
 
 
 def _find_run_by_id(workspace: Path, run_id: str) -> Path | None:
-    for info in discover_runs(workspace):
-        if info.run_id == run_id:
-            return info.dir
-    return None
+    return find_run_dir(_runs_root(workspace), run_id)
+
+
+# run_id -> run directory name; a hint only, every hit is checked against the run's manifest.
+_INDEX_NAME = "_index.json"
+
+
+def _load_run_index(runs_root: Path) -> dict[str, str]:
+    try:
+        data = json.loads((runs_root / _INDEX_NAME).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def _save_run_index(runs_root: Path, index: dict[str, str]) -> None:
+    path = runs_root / _INDEX_NAME
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    try:
+        tmp.write_text(json.dumps(index, ensure_ascii=True), encoding="utf-8")
+        tmp.replace(path)
+    except OSError:
+        pass
+
+
+def record_run_in_index(runs_root: Path, run_id: str, dir_name: str) -> None:
+    index = _load_run_index(runs_root)
+    index[run_id] = dir_name
+    _save_run_index(runs_root, index)
+
+
+def find_run_dir(runs_root: Path, run_id: str) -> Path | None:
+    index = _load_run_index(runs_root)
+    dir_name = index.get(run_id)
+    if isinstance(dir_name, str):
+        candidate = runs_root / dir_name
+        try:
+            if _load_manifest(candidate / "run.json").get("run_id") == run_id:
+                return candidate
+        except Exception:
+            pass
+    found: Path | None = None
+    rebuilt: dict[str, str] = {}
+    for info in _scan_runs(runs_root):
+        if info.run_id:
+            rebuilt[info.run_id] = info.dir.name
+        if info.run_id == run_id and found is None:
+            found = info.dir
+    if rebuilt != index:
+        _save_run_index(runs_root, rebuilt)
+    return found
 
 
 def resolve_run_ref(workspace: Path, ref: str) -> Path:
@@ -78,17 +131,23 @@ def resolve_run_ref(workspace: Path, ref: str) -> Path:
     raise ValueError(f"Run reference '{ref}' does not exist under {root}")
 
 
-def load_events(run_dir: Path) -> list[dict]:
+def _iter_events(events_path: Path) -> Iterator[dict]:
+    with events_path.open("r", encoding="utf-8") as handle:
+        for line in handle:
+            try:
+                yield json.loads(line)
+            except Exception:
+                continue
+
+
+def load_events(run_dir: Path, tail: int | None = None) -> list[dict]:
     events_path = run_dir / "events.ndjson"
     if not events_path.exists():
         return []
-    events: list[dict] = []
-    for line in events_path.read_text(encoding="utf-8").splitlines():
-        try:
-            events.append(json.loads(line))
-        except Exception:
-            continue
-    return events
+    if tail is not None and tail > 0:
+        return list(deque(_iter_events(events_path), maxlen=tail))
+    events = list(_iter_events(events_path))
+    return events[-tail:] if tail is not None else events
 
 
 def tail_events(run_dir: Path, follow: bool = False, poll_interval: float = 0.5) -> Iterator[dict]:
@@ -118,12 +177,15 @@ def _shorten(text: str, limit: int = 160) -> str:
 
 
 def format_runs_table(runs: Iterable[RunInfo]) -> str:
-    rows = [
-        ["run_id", "status", "mode", "updated_at", "title", "dir"],
-    ]
+    header = ["run_id", "status", "mode", "updated_at", "title", "dir"]
+    rows = [header]
+    col_sizes = [len(val) for val in header]
     for r in runs:
-        rows.append([r.run_id, r.status, r.mode, r.updated_at, _shorten(r.title, 30), str(r.dir.name)])
-    col_sizes = [max(len(row[i]) for row in rows) for i in range(len(rows[0]))]
+        row = [r.run_id, r.status, r.mode, r.updated_at, _shorten(r.title, 30), str(r.dir.name)]
+        rows.append(row)
+        for i, val in enumerate(row):
+            if len(val) > col_sizes[i]:
+                col_sizes[i] = len(val)
     lines = []
     for idx, row in enumerate(rows):
         line = "  ".join(val.ljust(col_sizes[i]) for i, val in enumerate(row))
@@ -135,9 +197,7 @@ def format_runs_table(runs: Iterable[RunInfo]) -> str:
 
 def format_run_show(run_dir: Path, tail: int | None = 20) -> str:
     manifest = _load_manifest(run_dir / "run.json")
-    events = load_events(run_dir)
-    if tail is not None:
-        events = events[-tail:]
+    events = load_events(run_dir, tail=tail)
     lines = [
         f"run: {run_dir.name}",
         f"run_id: {manifest.get('run_id','')}",
@@ -156,6 +216,8 @@ def format_run_show(run_dir: Path, tail: int | None = 20) -> str:
             summary = _shorten(str(data.get("text", "")))
         elif ev.get("type") == "artifact.write":
             summary = f"{data.get('path','')}"
+        elif ev.get("type") in ("session.end", "status.change"):
+            summary = f"{data.get('status','')} ({data.get('reason','')})"
         elif ev.get("type") == "tool.call":
             parts = [data.get("name", "")]
             if data.get("tool_call_id"):
@@ -1,11 +1,12 @@
 from __future__ import annotations
 
+import sys
 from dataclasses import dataclass, field
 
 
 @dataclass
 class ConsoleRenderer:
-    _buffer: str = field(default="", init=False)
+    _pending: list[str] = field(default_factory=list, init=False)
     _thinking_visible: bool = field(default=False, init=False)
 
     def show_banner(self) -> None:
@@ -45,19 +46,22 @@ class ConsoleRenderer:
         print("\r" + (" " * 20) + "\r", end="", flush=True)
 
     def write_delta(self, chunk: str) -> None:
-        self._buffer += chunk
-        lines = self._buffer.splitlines(keepends=True)
-        if not lines:
+        if "\n" not in chunk:
+            self._pending.append(chunk)
             return
-        if lines and not lines[-1].endswith("\n"):
-            self._buffer = lines.pop()
-        else:
-            self._buffer = ""
-        for line in lines:
-            print(line, end="", flush=True)
+        head, _, tail = chunk.rpartition("\n")
+        self._pending.append(head)
+        self._pending.append("\n")
+        complete = "".join(self._pending)
+        self._pending = [tail] if tail else []
+        # Looked up per call because patch_stdout swaps sys.stdout.
+        out = sys.stdout
+        out.write(complete)
+        out.flush()
 
     def end_message(self) -> None:
-        if self._buffer:
-            print(self._buffer, end="", flush=True)
-            self._buffer = ""
-        print()
+        self._pending.append("\n")
+        out = sys.stdout
+        out.write("".join(self._pending))
+        out.flush()
+        self._pending = []
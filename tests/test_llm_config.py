@@ -5,7 +5,14 @@ from pathlib import Path
 
 import pytest
 
-from puk.config import LLMSettings, log_resolved_llm_config, resolve_llm_config, validate_llm_settings
+from puk.config import (
+    LLMSettings,
+    get_global_config_path,
+    load_llm_config_file,
+    log_resolved_llm_config,
+    resolve_llm_config,
+    validate_llm_settings,
+)
 
 
 def _write_llm_config(path: Path, content: str) -> None:
@@ -160,3 +167,25 @@ def test_log_resolved_llm_config_redacts_literal_api_key(monkeypatch, tmp_path:
 
     assert "not-an-env-var-name-secret-value" not in caplog.text
     assert "LLM config api_key=<redacted>" in caplog.text
+
+
+def test_load_llm_config_file_picks_up_changes(tmp_path: Path) -> None:
+    path = tmp_path / ".puk.toml"
+    assert load_llm_config_file(path) == {}
+
+    _write_llm_config(path, '[llm]\nmodel = "a"\n')
+    assert load_llm_config_file(path) == {"model": "a"}
+    assert load_llm_config_file(path) == {"model": "a"}
+
+    _write_llm_config(path, '[llm]\nmodel = "bbb"\n')
+    assert load_llm_config_file(path) == {"model": "bbb"}
+
+
+def test_get_global_config_path_honors_skip_env(monkeypatch, tmp_path: Path) -> None:
+    global_path = tmp_path / "puk.toml"
+    global_path.write_text("", encoding="utf-8")
+    monkeypatch.setattr("puk.config._platform_global_config_path", lambda: global_path)
+
+    assert get_global_config_path() == global_path
+    monkeypatch.setenv("PUK_SKIP_GLOBAL_CONFIG", "1")
+    assert get_global_config_path() is None
@@ -0,0 +1,15 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from puk.paths import is_within, relative_posix
+
+
+def test_relative_posix_is_a_lexical_prefix_test(tmp_path: Path):
+    root = tmp_path.resolve()
+
+    assert relative_posix(root / "src" / "main.py", root) == "src/main.py"
+    assert relative_posix(root, root) == "."
+    assert relative_posix(root.parent / (root.name + "-sibling"), root) is None
+    assert is_within(root / "src", root)
+    assert not is_within(root.parent, root)
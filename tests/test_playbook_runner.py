@@ -1,13 +1,15 @@
 from __future__ import annotations
 
+import json
 from pathlib import Path
 
 import pytest
 
-from puk.config import WorkspaceSettings
-from puk.playbook_runner import _build_prompt, _prepare_output_directory
+from puk.config import LLMSettings, WorkspaceSettings
+from puk.playbook_runner import _build_prompt, _persist_plan, _prepare_output_directory
 from puk.playbooks import PlaybookValidationError
 from puk.playbooks import Playbook
+from puk.run import RunRecorder
 
 
 def test_build_prompt_includes_runtime_validation_note() -> None:
@@ -45,3 +47,17 @@ def test_prepare_output_directory_rejects_file_target(tmp_path: Path) -> None:
 
     with pytest.raises(PlaybookValidationError, match="not a directory"):
         _prepare_output_directory({"output_dir": str(target)}, tmp_path, WorkspaceSettings())
+
+
+def test_persist_plan_writes_artifact_and_events(tmp_path: Path) -> None:
+    recorder = RunRecorder(tmp_path, "plan", LLMSettings(), None, [])
+    recorder.start()
+
+    _persist_plan(recorder, '{"steps": [{"description": "do it"}]}')
+    recorder.close(status="planned", reason="planned")
+
+    plan = json.loads((recorder.paths.artifacts_dir / "plan.json").read_text(encoding="utf-8"))
+    assert plan["steps"][0]["description"] == "do it"
+    events = [json.loads(line) for line in recorder.paths.events.read_text().splitlines()]
+    assert [event["type"] for event in events[1:3]] == ["artifact.write", "playbook.plan"]
+    assert [event["seq"] for event in events] == list(range(1, len(events) + 1))
@@ -1,13 +1,17 @@
 from __future__ import annotations
 
+import time
 from pathlib import Path
 
 import pytest
 
 from puk.playbooks import (
+    _PLAYBOOK_CACHE,
     PlaybookValidationError,
+    extract_plan_from_text,
     is_path_within_scope,
     load_playbook,
+    render_body,
     resolve_parameters,
 )
 
@@ -49,6 +53,29 @@ Do something in {{target_dir}}.
     assert playbook.parameters["mode"].default == "fast"
 
 
+def test_load_playbook_reparses_after_edit(tmp_path: Path):
+    template = """---
+id: {id}
+version: 1.0.0
+description: Cached playbook
+parameters: {{}}
+allowed_tools: []
+write_scope: []
+run_mode: plan
+---
+Body.
+"""
+    path = _write_playbook(tmp_path, template.format(id="first"))
+    first = load_playbook(path)
+    assert load_playbook(path) is first
+
+    cached_entries = len(_PLAYBOOK_CACHE)
+
+    path.write_text(template.format(id="second-id"), encoding="utf-8")
+    assert load_playbook(path).id == "second-id"
+    assert len(_PLAYBOOK_CACHE) == cached_entries
+
+
 def test_resolve_parameters_enforces_required_and_types(tmp_path: Path):
     content = """---
 id: test-playbook
@@ -105,3 +132,30 @@ def test_is_path_within_scope_allows_base_directory_for_recursive_glob(tmp_path:
 
 def test_is_path_within_scope_rejects_outside_paths(tmp_path: Path):
     assert is_path_within_scope("../docs", tmp_path, ["docs/**"]) is False
+
+
+def test_render_body_substitutes_known_placeholders():
+    body = "Use {{target}} then {{mode}}; keep {{unknown}} and {{target}}."
+    rendered = render_body(body, {"target": "docs/", "mode": "{{target}}"})
+    assert rendered == "Use docs/ then {{target}}; keep {{unknown}} and docs/."
+
+
+def test_extract_plan_from_text_skips_surrounding_prose():
+    text = 'Plan [draft]: {"steps": [{"description": "close }"}]} Let me know {if needed}.'
+    assert extract_plan_from_text(text) == {"steps": [{"description": "close }"}]}
+
+
+def test_extract_plan_from_text_skips_non_plan_json():
+    text = 'Step [1]: {"note": "draft"} then {"steps": []}'
+    assert extract_plan_from_text(text) == {"steps": []}
+
+
+@pytest.mark.parametrize(
+    "text",
+    ["x " + "[" * 20000, '{"' + "a" * 20000 + "[" * 20000, "{[" * 20000],
+)
+def test_extract_plan_from_text_rejects_unbalanced_brackets_quickly(text: str):
+    started = time.perf_counter()
+    with pytest.raises(PlaybookValidationError):
+        extract_plan_from_text(text)
+    assert time.perf_counter() - started < 1.0
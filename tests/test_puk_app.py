@@ -1,13 +1,24 @@
 from __future__ import annotations
 
 from types import SimpleNamespace
+import fnmatch
 import pytest
 
 from pathlib import Path
 
-from puk.app import PukApp, PukConfig, run_app
-from puk.config import LLMSettings
+from puk.app import (
+    PukApp,
+    PukConfig,
+    _ListDirectoryParams,
+    _ReadFileParams,
+    _WriteFileParams,
+    _compile_glob_policy,
+    _coerce_turn_id,
+    run_app,
+)
+from puk.config import LLMSettings, WorkspaceSettings
 from puk.run import RunRecorder
+from puk import runs as run_inspect
 from copilot.generated.session_events import SessionEventType
 
 
@@ -419,3 +430,170 @@ def test_tool_failure_loop_guard_raises_on_repeated_identical_failures(monkeypat
     app._on_event(event)
     with pytest.raises(RuntimeError, match="Tool failure loop guard triggered"):
         app._on_event(event)
+
+
+@pytest.mark.parametrize(
+    ("raw", "expected"),
+    [(None, None), (3, 3), (" 4 ", 4), ("", None), ("abc", None), (True, None)],
+)
+def test_coerce_turn_id(raw, expected):
+    assert _coerce_turn_id(raw) == expected
+
+
+class StreamingSession(FakeSession):
+    async def send_and_wait(self, payload, timeout=None):
+        await super().send_and_wait(payload, timeout=timeout)
+        for chunk in ("hel", "lo"):
+            event = SimpleNamespace(
+                type=SessionEventType.ASSISTANT_MESSAGE_DELTA,
+                data=SimpleNamespace(delta_content=chunk),
+            )
+            for handler in self.handlers:
+                handler(event)
+        for handler in self.handlers:
+            handler(SimpleNamespace(type=SessionEventType.ASSISTANT_TURN_END, data=None))
+
+
+@pytest.mark.asyncio
+async def test_ask_capture_collects_streamed_output(monkeypatch, tmp_path: Path):
+    fake = FakeClient()
+    monkeypatch.setattr("puk.app.CopilotClient", lambda: fake)
+    recorder = RunRecorder(tmp_path, "oneshot", LLMSettings(), None, [])
+    recorder.start()
+    app = PukApp(PukConfig(workspace=str(tmp_path)), run_recorder=recorder)
+    app.renderer = SpyRenderer()
+    app.session = StreamingSession()
+    app.session.on(app._on_event)
+
+    assert await app.ask("hi", capture=True) == "hello"
+    assert app._output_buffer == []
+
+
+def test_list_directory_tool_formats_relative_entries(tmp_path: Path):
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "main.py").write_text("", encoding="utf-8")
+    (tmp_path / "README.md").write_text("", encoding="utf-8")
+    (tmp_path / ".git").mkdir()
+    app = PukApp(PukConfig(workspace=str(tmp_path)))
+
+    flat = app._tool_list_directory(_ListDirectoryParams(path="."), None)
+    nested = app._tool_list_directory(_ListDirectoryParams(path=".", recursive=True), None)
+
+    assert flat.splitlines() == ["README.md", "src/"]
+    assert nested.splitlines() == ["README.md", "src/", "src/main.py"]
+
+
+@pytest.mark.asyncio
+async def test_write_file_tool_writes_and_appends(tmp_path: Path):
+    app = PukApp(PukConfig(workspace=str(tmp_path)))
+
+    await app._tool_write_file(_WriteFileParams(path="notes.md", content="a"), None)
+    await app._tool_write_file(_WriteFileParams(path="notes.md", content="b", append=True), None)
+
+    assert (tmp_path / "notes.md").read_text(encoding="utf-8") == "ab"
+
+
+def test_read_file_tool_reads_lines_and_enforces_size_limit(tmp_path: Path):
+    (tmp_path / "docs").mkdir()
+    (tmp_path / "docs" / "notes.md").write_bytes(b"one\r\ntwo\r\nthree\n")
+    app = PukApp(
+        PukConfig(workspace=str(tmp_path), workspace_settings=WorkspaceSettings(max_file_bytes=8))
+    )
+
+    with pytest.raises(PermissionError, match="exceeds max_file_bytes"):
+        app._tool_read_file(_ReadFileParams(path="docs/notes.md"), None)
+
+    app = PukApp(PukConfig(workspace=str(tmp_path)))
+    assert app._tool_read_file(_ReadFileParams(path="docs/notes.md"), None) == "one\ntwo\nthree\n"
+    assert app._tool_read_file(_ReadFileParams(path="docs/notes.md", start_line=2), None) == "two\nthree"
+
+
+def test_read_file_tool_names_the_deny_glob(tmp_path: Path):
+    (tmp_path / "docs").mkdir()
+    (tmp_path / "docs" / "api_key.md").write_text("x", encoding="utf-8")
+    app = PukApp(PukConfig(workspace=str(tmp_path)))
+
+    with pytest.raises(PermissionError, match=r"matches deny glob '\*\*/\*key\*'"):
+        app._tool_read_file(_ReadFileParams(path="docs/api_key.md"), None)
+
+
+@pytest.mark.parametrize(
+    ("relative", "allowed"),
+    [
+        ("src/main.py", True),
+        ("docs/guide.md", True),
+        ("src/.env", False),
+        ("docs/api_key.md", False),
+        ("src/notes.txt", False),
+    ],
+)
+def test_is_allowed_by_globs_applies_deny_before_allow(tmp_path: Path, relative: str, allowed: bool):
+    app = PukApp(PukConfig(workspace=str(tmp_path)))
+    assert app._is_allowed_by_globs(tmp_path.resolve() / relative) is allowed
+
+
+@pytest.mark.parametrize(
+    "pattern",
+    ["README.md", "*.py", "**/.env", "docs/*", "**/*.md", "**/*secret*", "src/**/*.py", "*"],
+)
+@pytest.mark.parametrize(
+    "relative",
+    ["README.md", "main.py", "src/main.py", "src/pkg/main.py", ".env", "a/.env", "docs/x", "my_secret"],
+)
+def test_glob_policy_fast_paths_agree_with_fnmatch(pattern: str, relative: str):
+    expected = fnmatch.fnmatch(relative, pattern)
+    assert _compile_glob_policy((), (pattern,)).allows(relative) is expected
+    assert _compile_glob_policy((pattern,), ()).allows(relative) is not expected
+
+
+def test_is_ignored_path_checks_workspace_relative_parts(tmp_path: Path):
+    app = PukApp(PukConfig(workspace=str(tmp_path)))
+    root = tmp_path.resolve()
+
+    assert app._is_ignored_path(root / "node_modules" / "pkg" / "index.js")
+    assert not app._is_ignored_path(root / "src" / "main.py")
+    assert not app._is_ignored_path(root.parent / "node_modules")
+
+
+def test_local_commands_dispatch_and_require_a_run_ref(monkeypatch, capsys):
+    app = PukApp(PukConfig(workspace="."))
+    calls = []
+    monkeypatch.setattr(app, "_cmd_list_runs", lambda: calls.append("runs"))
+    monkeypatch.setattr(run_inspect, "resolve_run_ref", lambda *_args: calls.append("resolve"))
+
+    assert app._dispatch_local_command("/runs") is True
+    assert app._dispatch_local_command("/runsfoo") is False
+    assert app._dispatch_local_command("/run") is True
+    assert app._dispatch_local_command("/tail") is True
+    assert app._dispatch_local_command("/help me") is False
+    assert app._dispatch_local_command("hello") is False
+
+    assert calls == ["runs"]
+    assert capsys.readouterr().out.splitlines() == [
+        "[runs] Usage: /run <run-id>",
+        "[runs] Usage: /tail <run-id>",
+    ]
+
+
+def test_on_event_dispatches_to_overridden_handlers():
+    seen = []
+
+    class TracingApp(PukApp):
+        def _on_turn_end(self, data) -> None:
+            seen.append(("subclass", data))
+
+    app = TracingApp(PukConfig(workspace="."))
+    app._on_event(SimpleNamespace(type=SessionEventType.ASSISTANT_TURN_END, data="end"))
+    app._on_reasoning_delta = lambda data: seen.append(("instance", data))
+    app._on_event(SimpleNamespace(type=SessionEventType.ASSISTANT_REASONING_DELTA, data="think"))
+
+    assert seen == [("subclass", "end"), ("instance", "think")]
+
+
+def test_read_file_tool_reports_missing_path_under_a_file(tmp_path: Path):
+    (tmp_path / "docs").mkdir()
+    (tmp_path / "docs" / "notes.md").write_text("x", encoding="utf-8")
+    app = PukApp(PukConfig(workspace=str(tmp_path)))
+
+    with pytest.raises(FileNotFoundError, match="Path does not exist"):
+        app._tool_read_file(_ReadFileParams(path="docs/notes.md/child.md"), None)
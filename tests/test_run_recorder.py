@@ -31,7 +31,9 @@ def test_create_run_and_events(tmp_path):
     assert manifest["status"] == "closed"
     events = _read_events(recorder.paths.events)
     assert events[0]["type"] == "session.start"
-    assert events[-1]["type"] == "status.change"
+    assert events[-1]["type"] == "session.end"
+    assert events[-1]["data"] == {"status": "closed", "reason": "completed"}
+    assert not any(ev["type"] == "status.change" for ev in events)
     assert any(ev["type"] == "input.user" for ev in events)
 
 
@@ -120,3 +122,42 @@ def test_tool_call_and_result_events_include_metadata(tmp_path):
     assert tool_result["data"]["tool_call_id"] == "call_123"
     assert tool_result["data"]["success"] is True
     assert tool_result["data"]["result"] == "ok"
+
+
+def test_events_are_visible_before_close(tmp_path):
+    recorder = RunRecorder(tmp_path, "oneshot", LLMSettings(), None, [])
+    recorder.start()
+    recorder.record_event("custom", {"n": 1})
+
+    # Readers such as `puk runs tail --follow` see each event as soon as it is recorded.
+    assert [ev["type"] for ev in _read_events(recorder.paths.events)] == ["session.start", "custom"]
+
+    recorder.close(status="closed", reason="completed")
+    assert recorder._events_handle is None
+
+
+def test_append_continues_sequence_from_last_event(tmp_path):
+    recorder1 = RunRecorder(tmp_path, "oneshot", LLMSettings(), None, [])
+    recorder1.start()
+    recorder1.record_event("custom", {"n": 1})
+    recorder1.close(status="closed", reason="completed")
+    last_seq = recorder1.seq
+
+    recorder2 = RunRecorder(tmp_path, "oneshot", LLMSettings(), recorder1.run_id, [])
+    recorder2.start()
+    recorder2.close(status="closed", reason="completed")
+
+    seqs = [ev["seq"] for ev in _read_events(recorder1.paths.events)]
+    assert seqs == list(range(1, len(seqs) + 1))
+    assert seqs[last_seq] == last_seq + 1
+
+
+def test_legacy_events_env_adds_status_change(tmp_path, monkeypatch):
+    monkeypatch.setenv("PUK_LEGACY_EVENTS", "1")
+    recorder = RunRecorder(tmp_path, "oneshot", LLMSettings(), None, [])
+    recorder.start()
+    recorder.close(status="closed", reason="completed")
+
+    events = _read_events(recorder.paths.events)
+    assert [ev["type"] for ev in events[-2:]] == ["session.end", "status.change"]
+    assert events[-1]["data"] == {"status": "closed", "reason": "completed"}
@@ -39,3 +39,23 @@ def test_tail_events_reads(tmp_path: Path):
     run_dir = _make_run(tmp_path)
     events = list(run_inspect.tail_events(run_dir, follow=False))
     assert any(ev.get("type") == "model.output" for ev in events)
+
+
+def test_load_events_tail_keeps_last_events(tmp_path: Path):
+    run_dir = _make_run(tmp_path)
+    all_events = run_inspect.load_events(run_dir)
+    assert run_inspect.load_events(run_dir, tail=2) == all_events[-2:]
+    assert run_inspect.load_events(run_dir, tail=len(all_events) + 5) == all_events
+
+
+def test_run_id_lookup_uses_index_and_recovers_from_stale_entries(tmp_path: Path):
+    run_dir = _make_run(tmp_path)
+    runs_root = run_dir.parent
+    run_id = json.loads((run_dir / "run.json").read_text(encoding="utf-8"))["run_id"]
+    index = json.loads((runs_root / "_index.json").read_text(encoding="utf-8"))
+    assert index == {run_id: run_dir.name}
+
+    (runs_root / "_index.json").write_text(json.dumps({run_id: "gone"}), encoding="utf-8")
+    assert run_inspect.resolve_run_ref(tmp_path, run_id) == run_dir
+    index = json.loads((runs_root / "_index.json").read_text(encoding="utf-8"))
+    assert index == {run_id: run_dir.name}
@@ -0,0 +1,18 @@
+from __future__ import annotations
+
+from puk.ui import ConsoleRenderer
+
+
+def test_write_delta_emits_complete_lines_and_holds_the_tail(capsys):
+    renderer = ConsoleRenderer()
+
+    renderer.write_delta("Hel")
+    renderer.write_delta("lo")
+    assert capsys.readouterr().out == ""
+
+    renderer.write_delta(" world\nsecond\nthi")
+    assert capsys.readouterr().out == "Hello world\nsecond\n"
+
+    renderer.write_delta("rd")
+    renderer.end_message()
+    assert capsys.readouterr().out == "third\n"